@@ -0,0 +1,82 @@
+"""
+Command-line entry point for MidiMap.
+"""
+
+import argparse
+import sys
+
+from src.mapper import MIDIToKeyboardMapper
+from utils.resources import is_bundled
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(
+        description="Map MIDI keyboard notes to computer keyboard keys"
+    )
+    parser.add_argument(
+        '-c', '--config',
+        default=None,
+        help='Path to configuration file (default: config.json)'
+    )
+    parser.add_argument(
+        '--profile',
+        help='Profile name to use (default: current profile or "default")'
+    )
+    parser.add_argument(
+        '-p', '--port',
+        help='MIDI input port name (default: first available)'
+    )
+    parser.add_argument(
+        '-l', '--list-ports',
+        action='store_true',
+        help='List available MIDI input ports and exit'
+    )
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Print each mapped note event'
+    )
+    parser.add_argument(
+        '-g', '--gui',
+        action='store_true',
+        help='Launch GUI application for interactive key mapping'
+    )
+    parser.add_argument(
+        '--no-gui',
+        action='store_true',
+        help='Run in CLI mode (only for bundled exe)'
+    )
+    return parser
+
+
+# Built once at import; main() only parses
+_PARSER = build_parser()
+
+
+def main():
+    """Main entry point."""
+    args = _PARSER.parse_args()
+    
+    # Auto-launch GUI when running as bundled exe (unless --no-gui is specified)
+    if is_bundled() and not args.no_gui and not args.list_ports:
+        args.gui = True
+    
+    if args.gui:
+        try:
+            from src.gui import main as gui_main
+            gui_main()
+            return
+        except ImportError as e:
+            print(f"Error: GUI module not available: {e}")
+            sys.exit(1)
+    
+    mapper = MIDIToKeyboardMapper(
+        config_file=args.config, profile_name=args.profile, verbose=args.verbose
+    )
+    
+    if args.list_ports:
+        mapper.list_midi_ports()
+        return
+    
+    mapper.run(port_name=args.port)
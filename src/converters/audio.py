@@ -3,7 +3,12 @@ Audio to MIDI Converter.
 Converts audio files (mp3, wav, etc.) to MIDI files using AI transcription.
 """
 
+import importlib.util
+import os
+import sys
+import queue
 import threading
+import time
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
@@ -11,20 +16,51 @@ from typing import Optional, Callable, List, Tuple
 
 import numpy as np
 
-from utils.resources import get_model_path
+from utils.resources import get_model_cache_dir, get_model_path, is_bundled
+
+
+# MIDIMAP_EP values and the onnxruntime providers they select
+_PROVIDER_NAMES = {
+    'CPU': 'CPUExecutionProvider',
+    'CUDA': 'CUDAExecutionProvider',
+    'DML': 'DmlExecutionProvider',
+    'DIRECTML': 'DmlExecutionProvider',
+}
+_PROVIDER_LABELS = {
+    'CPUExecutionProvider': 'CPU',
+    'CUDAExecutionProvider': 'CUDA (GPU)',
+    'DmlExecutionProvider': 'DirectML (GPU)',
+}
+# Filled on first load_model; the installed onnxruntime build can't change while running
+_available_providers = None
 
 
 class AudioToMidiConverter:
     
+    # ORT intra-op threads for each batch worker's session; workers are cpu_count // this
+    BATCH_INTRA_OP_THREADS = 2
+    
     def __init__(self):
         self.model = None
         self.transcriber = None
+        # Session with fewer intra-op threads shared by parallel batch workers, built on first use
+        self._batch_transcriber = None
+        self._session_path: Optional[Path] = None
+        self._providers: Optional[List[str]] = None
         self.model_loaded = False
         self.converting = False
         self.progress_callback: Optional[Callable] = None
         self.log_callback: Optional[Callable] = None
         self._model_path = get_model_path()
+        # Threads each session.run uses for single-file conversion
+        self._intra_op_threads = os.cpu_count() or 1
         self.last_error: Optional[str] = None
+        # Most recent batch-conversion failure, see format_last_exception()
+        self.last_exception: Optional[traceback.TracebackException] = None
+        # Progress updates are handed to a separate thread so a slow UI never stalls inference
+        self._progress_queue: queue.Queue = queue.Queue(maxsize=16)
+        self._progress_thread = threading.Thread(target=self._progress_loop, daemon=True)
+        self._progress_thread.start()
     
     def is_model_available(self) -> bool:
         """Check if the AI model file exists."""
@@ -32,23 +68,11 @@ class AudioToMidiConverter:
     
     def check_dependencies(self) -> tuple:
         """Check if all required dependencies are installed."""
-        missing = []
-        
-        try:
-            import librosa
-        except ImportError:
-            missing.append("librosa")
-        
-        try:
-            import onnxruntime
-        except ImportError:
-            missing.append("onnxruntime")
-        
-        try:
-            import mido
-        except ImportError:
-            missing.append("mido")
-        
+        # find_spec only locates the packages; importing librosa here would cost seconds
+        missing = [
+            name for name in ("librosa", "onnxruntime", "mido")
+            if importlib.util.find_spec(name) is None
+        ]
         return len(missing) == 0, missing
     
     def load_model(self) -> bool:
@@ -69,18 +93,19 @@ class AudioToMidiConverter:
         try:
             self._log("Loading AI model...")
             
+            import onnxruntime as ort
+            self._session_path = self._ensure_optimized_model()
+            self._providers = self._select_providers(ort)
             try:
-                import onnxruntime as ort
-                providers = ['DmlExecutionProvider', 'CPUExecutionProvider']
-                self.model = ort.InferenceSession(str(self._model_path), providers=providers)
-                self._log("Model loaded with DirectML (GPU)")
+                self.model = self._create_main_session(ort)
             except Exception as e:
-                self._log(f"DirectML not available: {e}")
-                import onnxruntime as ort
-                self.model = ort.InferenceSession(
-                    str(self._model_path), providers=['CPUExecutionProvider']
-                )
-                self._log("Model loaded with CPU")
+                if self._session_path == self._model_path:
+                    raise
+                self._log(f"INT8 model failed to load, using FP32 model: {e}")
+                self._session_path = self._model_path
+                self.model = self._create_main_session(ort)
+            providers = self._providers
+            self._log(f"Model loaded with {_PROVIDER_LABELS.get(providers[0], providers[0])}")
             
             self._log("Initializing transcriber...")
             from src.converters.inference import PianoConverter
@@ -96,6 +121,102 @@ class AudioToMidiConverter:
             self.last_error = error_msg
             return False
     
+    def _create_main_session(self, ort):
+        """Create the main session, retrying on CPU alone if the accelerated provider fails to start."""
+        try:
+            return self._create_session(ort, self._intra_op_threads)
+        except Exception as e:
+            provider = self._providers[0]
+            if provider == 'CPUExecutionProvider':
+                raise
+            self._log(f"{_PROVIDER_LABELS.get(provider, provider)} failed to start, using CPU: {e}")
+            self._providers = ['CPUExecutionProvider']
+            return self._create_session(ort, self._intra_op_threads)
+    
+    def _select_providers(self, ort) -> List[str]:
+        """Pick execution providers from what this onnxruntime build offers (MIDIMAP_EP overrides)."""
+        global _available_providers
+        if _available_providers is None:
+            _available_providers = frozenset(ort.get_available_providers())
+        
+        forced = os.environ.get('MIDIMAP_EP', '').strip().upper()
+        if forced:
+            provider = _PROVIDER_NAMES.get(forced)
+            if provider == 'CPUExecutionProvider':
+                return [provider]
+            if provider in _available_providers:
+                return [provider, 'CPUExecutionProvider']
+            self._log(f"MIDIMAP_EP={forced} is not available in this onnxruntime build")
+        
+        if 'DmlExecutionProvider' in _available_providers:
+            return ['DmlExecutionProvider', 'CPUExecutionProvider']
+        return ['CPUExecutionProvider']
+    
+    def _ensure_optimized_model(self) -> Path:
+        """Return the model file to load, quantizing to INT8 once when MIDIMAP_USE_INT8=1."""
+        if os.environ.get('MIDIMAP_USE_INT8') != '1':
+            return self._model_path
+        
+        quantized_path = get_model_cache_dir() / (self._model_path.stem + '.int8.onnx')
+        # Reuse the cached copy unless the model was replaced after it was made; a bundled
+        # model is re-extracted every launch, so the exe's own mtime stands in for it
+        source = Path(sys.executable) if is_bundled() else self._model_path
+        if (quantized_path.exists()
+                and quantized_path.stat().st_mtime >= source.stat().st_mtime):
+            return quantized_path
+        
+        # Quantize into a temp file and swap it in, so an interrupted run
+        # never leaves a truncated model that later loads would pick up
+        tmp_path = quantized_path.with_name(self._model_path.stem + '.int8.tmp.onnx')
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            self._log("Quantizing model to INT8 (first run only)...")
+            quantized_path.parent.mkdir(parents=True, exist_ok=True)
+            quantize_dynamic(
+                str(self._model_path), str(tmp_path),
+                weight_type=QuantType.QInt8,
+                op_types_to_quantize=['MatMul', 'Gemm', 'Conv']
+            )
+            os.replace(tmp_path, quantized_path)
+            self._log(f"Saved INT8 model: {quantized_path}")
+            return quantized_path
+        except Exception as e:
+            self._log(f"INT8 quantization failed, using FP32 model: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return self._model_path
+    
+    def _create_session(self, ort, intra_op_threads: int):
+        """Create an InferenceSession for the model chosen in load_model."""
+        return ort.InferenceSession(
+            str(self._session_path),
+            sess_options=self._session_options(ort, intra_op_threads),
+            providers=self._providers
+        )
+    
+    def _get_batch_transcriber(self):
+        """Transcriber whose session uses BATCH_INTRA_OP_THREADS, for parallel batch workers."""
+        if self._batch_transcriber is None:
+            import onnxruntime as ort
+            from src.converters.inference import PianoConverter
+            self._batch_transcriber = PianoConverter(
+                model=self._create_session(ort, self.BATCH_INTRA_OP_THREADS)
+            )
+        return self._batch_transcriber
+    
+    def _session_options(self, ort, intra_op_threads: int):
+        """Build ONNX Runtime session options: full graph fusion, intra_op_threads for each op."""
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # The model is a single chain of ops, so parallelism belongs inside each op
+        sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        sess_options.intra_op_num_threads = intra_op_threads
+        sess_options.inter_op_num_threads = 1
+        sess_options.add_session_config_entry("session.use_env_allocators", "1")
+        return sess_options
+    
     def convert_audio_to_midi(self, audio_path: str, 
                               output_midi_path: Optional[str] = None) -> Optional[str]:
         """Convert an audio file to MIDI."""
@@ -197,7 +318,8 @@ class AudioToMidiConverter:
         
         Args:
             file_pairs: List of (audio_path, output_midi_path) tuples
-            max_workers: Maximum number of parallel conversions
+            max_workers: Maximum number of parallel conversions (also capped at
+                cpu_count // BATCH_INTRA_OP_THREADS so workers don't oversubscribe the CPU)
             on_file_complete: Callback(filename, success) for each file
             on_all_complete: Callback(success_count, failed_count) when all done
             on_progress: Callback(completed, total) for progress updates
@@ -216,6 +338,18 @@ class AudioToMidiConverter:
             failed_count = 0
             completed = 0
             total = len(file_pairs)
+            self.last_exception = None
+            cpu_count = os.cpu_count() or 1
+            workers = max(1, min(max_workers, total, cpu_count // self.BATCH_INTRA_OP_THREADS))
+            if workers > 1:
+                # Each worker's session.run gets a few threads instead of all cores
+                try:
+                    transcriber = self._get_batch_transcriber()
+                except Exception as e:
+                    self._log(f"Could not create batch session, converting one file at a time: {e}")
+                    transcriber, workers = self.transcriber, 1
+            else:
+                transcriber = self.transcriber
             
             # Use lock for thread-safe counter updates
             lock = threading.Lock()
@@ -223,15 +357,17 @@ class AudioToMidiConverter:
             def convert_one(audio_path: str, output_path: str) -> Tuple[str, bool]:
                 """Convert a single file (runs in thread pool)."""
                 try:
-                    result = self._convert_single_threadsafe(audio_path, output_path)
+                    result = self._convert_single_threadsafe(audio_path, output_path, transcriber)
                     return (audio_path, result is not None)
                 except Exception as e:
+                    # Snapshot the traceback without keeping its frames (and their arrays) alive
+                    self.last_exception = traceback.TracebackException(type(e), e, e.__traceback__)
                     self._log(f"Error converting {Path(audio_path).name}: {e}")
                     return (audio_path, False)
             
-            self._log(f"Starting batch conversion of {total} files with {max_workers} workers...")
+            self._log(f"Starting batch conversion of {total} files with {workers} workers...")
             
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
                 # Submit all conversion tasks
                 futures = {
                     executor.submit(convert_one, audio_path, output_path): (audio_path, output_path)
@@ -268,47 +404,62 @@ class AudioToMidiConverter:
         thread.start()
         return thread
     
-    def _convert_single_threadsafe(self, audio_path: str, output_midi_path: str) -> Optional[str]:
-        """Thread-safe single file conversion (model must be pre-loaded)."""
-        try:
-            audio_path = Path(audio_path)
-            if not audio_path.exists():
-                return None
-            
-            output_midi_path = Path(output_midi_path)
-            
-            # Load audio
-            audio = self._load_audio(str(audio_path))
-            if audio is None:
-                return None
-            
-            duration = len(audio) / 16000
-            if duration < 1:
-                return None
-            
-            # Create a separate transcriber instance for thread safety
-            from src.converters.inference import PianoConverter
-            transcriber = PianoConverter(model=self.model)
-            
-            # Transcribe (no progress callbacks in parallel mode)
-            result = transcriber.transcribe(
-                audio=audio,
-                midi_path=str(output_midi_path),
-                setProgressBarValue=lambda x: None,
-                setProgressBarVisibility=lambda x: None,
-                setProgressBarFullValue=lambda x: None,
-                logUpdate=lambda x: None  # Suppress per-file logs in parallel mode
-            )
-            
-            return str(output_midi_path) if result else None
-            
-        except Exception as e:
+    def _convert_single_threadsafe(self, audio_path: str, output_midi_path: str,
+                                   transcriber) -> Optional[str]:
+        """Thread-safe single file conversion (model must be pre-loaded); errors propagate."""
+        audio_path = Path(audio_path)
+        if not audio_path.exists():
             return None
+        
+        output_midi_path = Path(output_midi_path)
+        
+        # Load audio
+        audio = self._load_audio(str(audio_path))
+        if audio is None:
+            return None
+        
+        duration = len(audio) / 16000
+        if duration < 1:
+            return None
+        
+        # InferenceSession.run is safe to call concurrently and transcribe() keeps
+        # its per-file state (post-processor, buffers) local, so one transcriber serves all workers
+        result = transcriber.transcribe(
+            audio=audio,
+            midi_path=str(output_midi_path),
+            setProgressBarValue=lambda x: None,
+            setProgressBarVisibility=lambda x: None,
+            setProgressBarFullValue=lambda x: None,
+            logUpdate=lambda x: None  # Suppress per-file logs in parallel mode
+        )
+        
+        return str(output_midi_path) if result else None
+    
+    def format_last_exception(self) -> Optional[str]:
+        """Format the traceback of the most recent batch-conversion failure."""
+        if self.last_exception is None:
+            return None
+        return "".join(self.last_exception.format())
     
     def _load_audio(self, path: str, sr: int = 16000) -> Optional[np.ndarray]:
         """Load audio file and resample to target sample rate."""
         self._log(f"Attempting to load: {path}")
         
+        try:
+            import soundfile as sf
+            audio, orig_sr = sf.read(path, dtype='float32', always_2d=False)
+            if audio.ndim > 1:
+                audio = audio.mean(axis=1, dtype=np.float32)
+            if orig_sr != sr:
+                from math import gcd
+                from scipy.signal import resample_poly
+                g = gcd(sr, orig_sr)
+                audio = resample_poly(audio, sr // g, orig_sr // g).astype(np.float32, copy=False)
+            self._log(f"Loaded with soundfile: {len(audio)} samples")
+            return audio
+        except Exception as e:
+            self._log(f"soundfile failed: {type(e).__name__}: {e}")
+        
         try:
             import librosa
             self._log("Using librosa to load audio...")
@@ -341,20 +492,42 @@ class AudioToMidiConverter:
         else:
             print(message)
     
+    def _progress_loop(self):
+        """Deliver queued progress updates to the callback, at most every 50ms."""
+        progress_queue = self._progress_queue
+        while True:
+            updates = [progress_queue.get()]
+            try:
+                while True:
+                    updates.append(progress_queue.get_nowait())
+            except queue.Empty:
+                pass
+            for i, (kind, value) in enumerate(updates):
+                # Only the newest of consecutive value updates is worth drawing
+                if kind == 'value' and i + 1 < len(updates) and updates[i + 1][0] == 'value':
+                    continue
+                if self.progress_callback:
+                    self.progress_callback(kind, value)
+            time.sleep(0.05)
+    
     def _set_progress(self, value: int):
         """Update progress value."""
         if self.progress_callback:
-            self.progress_callback('value', value)
+            try:
+                self._progress_queue.put_nowait(('value', value))
+            except queue.Full:
+                # A newer value will follow; never block the inference thread
+                pass
     
     def _set_progress_max(self, max_value: int):
         """Set maximum progress value."""
         if self.progress_callback:
-            self.progress_callback('max', max_value)
+            self._progress_queue.put(('max', max_value))
     
     def _set_progress_visible(self, visible: bool):
         """Set progress visibility."""
         if self.progress_callback:
-            self.progress_callback('visible', visible)
+            self._progress_queue.put(('visible', visible))
 
 
 # Singleton instance
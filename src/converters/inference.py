@@ -2,110 +2,217 @@
 Piano converter engine using ONNX model.
 """
 
+import threading
+from functools import lru_cache
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from librosa.filters import mel as librosa_mel_fn
-from librosa import stft, power_to_db
+
+try:
+    from scipy.fft import rfft as scipy_rfft
+except ImportError:
+    scipy_rfft = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 from utils.audio import RegressionPostProcessor, write_events_to_midi
+from utils.bufpool import float32_pool
 from utils import config
+from utils.resources import is_bundled
 
 
-def append_to_dict(dict, key, value):
-    if key in dict.keys():
-        dict[key].append(value)
-    else:
-        dict[key] = [value]
- 
-
-def output_to_dict(note_output, pedal_output):
-    full_output_dict = {
-        'reg_onset_output': note_output[0], 
-        'reg_offset_output': note_output[1], 
-        'frame_output': note_output[2], 
-        'velocity_output': note_output[3],
-        'reg_pedal_onset_output': pedal_output[0], 
-        'reg_pedal_offset_output': pedal_output[1],
-        'pedal_frame_output': pedal_output[2]
-    }
-    return full_output_dict
-
-
-def forward(model, x, batch_size, setProgressBarValue, setProgressBarVisibility,
-            setProgressBarFullValue, logUpdate=print, frames_per_second=100):
-    """Forward data to model in mini-batch."""
-    sample_rate = 16000
-    window_size = 2048
-    hop_size = sample_rate // frames_per_second
-    mel_bins = 229
-    fmin = 30
-    fmax = sample_rate // 2
-
-    window = 'hann'
-    center = True
-    pad_mode = 'reflect'
-    ref = 1.0
-    amin = 1e-10
-    top_db = None
+# Output dict keys, in the order they are stacked in the model's two outputs
+NOTE_OUTPUT_KEYS = ('reg_onset_output', 'reg_offset_output', 'frame_output', 'velocity_output')
+PEDAL_OUTPUT_KEYS = ('reg_pedal_onset_output', 'reg_pedal_offset_output', 'pedal_frame_output')
+
 
-    logmel = librosa_mel_fn(
-        sr=sample_rate, n_fft=window_size, n_mels=mel_bins,
-        fmin=fmin, fmax=fmax
+# Log-mel front end the model was trained with
+WINDOW_SIZE = 2048
+MEL_BINS = 229
+FMIN = 30
+
+
+@lru_cache(maxsize=1)
+def get_mel_filter():
+    """Return the (freq_bins, mel_bins) float32 mel filterbank, built once per process."""
+    mel_filter = librosa_mel_fn(
+        sr=config.sample_rate, n_fft=WINDOW_SIZE, n_mels=MEL_BINS,
+        fmin=FMIN, fmax=config.sample_rate // 2
     ).T
+    mel_filter = np.ascontiguousarray(mel_filter, dtype=np.float32)
+    mel_filter.setflags(write=False)
+    return mel_filter
+
+
+@lru_cache(maxsize=1)
+def get_hann_window():
+    """Return the periodic Hann window librosa.stft uses, as float32."""
+    n = np.arange(WINDOW_SIZE)
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * n / WINDOW_SIZE)).astype(np.float32)
+    window.setflags(write=False)
+    return window
+
+
+@lru_cache(maxsize=1)
+def get_mel_bands():
+    """Return (lo, hi) int arrays: the nonzero frequency-bin range of each mel band."""
+    nonzero = get_mel_filter() != 0
+    lo = np.argmax(nonzero, axis=0)
+    hi = nonzero.shape[0] - np.argmax(nonzero[::-1], axis=0)
+    # An empty band sums nothing
+    hi[~nonzero.any(axis=0)] = 0
+    return lo.astype(np.int64), hi.astype(np.int64)
+
+
+if njit is not None:
+    # A frozen build has no writable source tree for numba's on-disk cache
+    @njit(parallel=True, fastmath=True, cache=not is_bundled())
+    def mel_logpower(spectrum, mel_filter, band_lo, band_hi, out, amin):
+        """Fused |spectrum|^2 -> mel projection -> 10*log10, touching only each band's bins."""
+        n, frames_num, _ = spectrum.shape
+        mel_bins = mel_filter.shape[1]
+        for i in prange(n * frames_num):
+            b = i // frames_num
+            t = i - b * frames_num
+            for m in range(mel_bins):
+                acc = 0.0
+                for f in range(band_lo[m], band_hi[m]):
+                    v = spectrum[b, t, f]
+                    acc += (v.real * v.real + v.imag * v.imag) * mel_filter[f, m]
+                out[b, t, m] = 10.0 * np.log10(max(acc, amin))
+else:
+    mel_logpower = None
+
+# The kernel already fans out over every core, and numba's workqueue threading
+# layer aborts if parallel regions are entered from several threads at once
+_mel_logpower_lock = threading.Lock()
+
+
+def rfft_frames(frames):
+    """Real FFT over the last axis, multi-threaded through scipy when it is installed."""
+    if scipy_rfft is not None:
+        return scipy_rfft(frames, axis=-1, workers=-1)
+    return np.fft.rfft(frames, axis=-1)
+
+
+def iter_forward(model, x, batch_size, setProgressBarValue, setProgressBarVisibility,
+                 setProgressBarFullValue, logUpdate=print, frames_per_second=100,
+                 mel_filter=None):
+    """Run the model over x in mini-batches, yielding (first_segment_index, {key: outputs}).
+
+    The yielded arrays come fresh from copy_outputs_to_cpu() each batch, so callers
+    may keep them without copying.
+    """
+    sample_rate = config.sample_rate
+    window_size = WINDOW_SIZE
+    hop_size = sample_rate // frames_per_second
+    mel_bins = MEL_BINS
+    amin = 1e-10
 
-    output_dict = {}
+    if mel_filter is None:
+        mel_filter = get_mel_filter()
+    window = get_hann_window()
+    if mel_logpower is not None:
+        band_lo, band_hi = get_mel_bands()
+
+    # The input tensor is filled in place each batch and handed to ORT without a copy
+    io_binding = model.io_binding()
+    for output in model.get_outputs():
+        io_binding.bind_output(output.name)
+    input_buf = None
+    power_buf = None
+    frames_buf = None
     
     pointer = 0
-    total_segments = int(np.ceil(len(x) / batch_size))
+    # pointer counts segments, so the bar does too
+    total_segments = len(x)
     setProgressBarFullValue(total_segments)
     setProgressBarVisibility(True)
     
-    while True:
-        logUpdate('Segment {} / {}'.format(pointer, total_segments))
-        setProgressBarValue(pointer)
-        if pointer >= len(x):
-            break
-
-        batch_waveform = x[pointer:pointer + batch_size]
-        pointer += batch_size
-
-        batch_waveform = stft(
-            y=batch_waveform, n_fft=window_size,
-            hop_length=hop_size, win_length=window_size, window=window,
-            center=center, pad_mode=pad_mode,
-        )
-        
-        mel_spectrogram = np.dot(
-            np.abs(np.transpose(batch_waveform, axes=(0, 2, 1))) ** 2, logmel
-        )
-        logmel_spectrogram = power_to_db(
-            mel_spectrogram, ref=ref, amin=amin, top_db=top_db
-        )
-        batch_waveform = np.expand_dims(logmel_spectrogram, axis=1)
-
-        # Run ONNX inference
-        outputs = model.run(None, {'input': batch_waveform.astype(np.float32)})
-        note_stacked = outputs[0]
-        pedal_stacked = outputs[1]
-        
-        note_output = [note_stacked[i] for i in range(4)]
-        pedal_output = [pedal_stacked[i] for i in range(3)]
-        batch_output_dict = output_to_dict(note_output, pedal_output)
-
-        for key in batch_output_dict.keys():
-            append_to_dict(output_dict, key, batch_output_dict[key])
-
-    for key in output_dict.keys():
-        output_dict[key] = np.concatenate(output_dict[key], axis=0)
+    try:
+        while True:
+            done = min(pointer, total_segments)
+            logUpdate('Segment {} / {}'.format(done, total_segments))
+            setProgressBarValue(done)
+            if pointer >= len(x):
+                break
+
+            start = pointer
+            batch_waveform = x[pointer:pointer + batch_size]
+            pointer += batch_size
+
+            n = batch_waveform.shape[0]
+
+            # Centered STFT frames, reflect-padded like librosa.stft(center=True), as a strided view
+            half = window_size // 2
+            padded = np.pad(batch_waveform, ((0, 0), (half, half)), mode='reflect')
+            frames = sliding_window_view(padded, window_size, axis=-1)[:, ::hop_size]
+
+            if input_buf is None:
+                frames_num = frames.shape[1]
+                freq_bins = window_size // 2 + 1
+                # Same shapes for every file, so these come back from the pool after the first one
+                input_buf = float32_pool.acquire((batch_size, 1, frames_num, mel_bins))
+                if mel_logpower is None:
+                    # Only the NumPy path materializes the power spectrum
+                    power_buf = float32_pool.acquire((batch_size, frames_num, freq_bins))
+                frames_buf = float32_pool.acquire((batch_size, frames_num, window_size))
+
+            windowed = frames_buf[:n]
+            np.multiply(frames, window, out=windowed)
+            # (batch, time, freq)
+            spectrum = rfft_frames(windowed)
+
+            batch_input = input_buf[:n]
+            mel_spectrogram = batch_input[:, 0]
+            if mel_logpower is not None:
+                # One pass over the spectrum instead of power, matmul and log as separate passes
+                with _mel_logpower_lock:
+                    mel_logpower(spectrum, mel_filter, band_lo, band_hi, mel_spectrogram, amin)
+            else:
+                power = power_buf[:n]
+                np.square(spectrum.real, out=power)
+                power += np.square(spectrum.imag)
+                np.matmul(power, mel_filter, out=mel_spectrogram)
+                # power_to_db(ref=1.0, top_db=None) is 10 * log10(max(S, amin)); done in place
+                np.maximum(mel_spectrogram, amin, out=mel_spectrogram)
+                np.log10(mel_spectrogram, out=mel_spectrogram)
+                mel_spectrogram *= 10.0
+
+            # Run ONNX inference
+            io_binding.bind_cpu_input('input', batch_input)
+            model.run_with_iobinding(io_binding)
+            outputs = io_binding.copy_outputs_to_cpu()
+            note_stacked = outputs[0]
+            pedal_stacked = outputs[1]
+
+            batch_output = {}
+            for i, key in enumerate(NOTE_OUTPUT_KEYS):
+                batch_output[key] = note_stacked[i]
+            for i, key in enumerate(PEDAL_OUTPUT_KEYS):
+                batch_output[key] = pedal_stacked[i]
+            yield start, batch_output
+    finally:
+        if input_buf is not None:
+            float32_pool.release(input_buf)
+            if power_buf is not None:
+                float32_pool.release(power_buf)
+            float32_pool.release(frames_buf)
 
     setProgressBarVisibility(False)
-    return output_dict
 
 
 class PianoConverter:
     """Piano converter using ONNX model."""
     
-    def __init__(self, model, checkpoint_path=None, segment_samples=16000*10):
+    def __init__(self, model, checkpoint_path=None, segment_samples=16000*10, batch_size=4):
         self.segment_samples = segment_samples
+        # Segments per session.run call
+        self.batch_size = batch_size
         self.frames_per_second = config.frames_per_second
         self.classes_num = config.classes_num
         # Thresholds for note detection
@@ -117,31 +224,57 @@ class PianoConverter:
         self.frame_threshold = 0.5   # Higher = notes end when sound fades
         self.pedal_offset_threshold = 0.2
         self.model = model
+        self.mel_filter = get_mel_filter()
+        if mel_logpower is not None:
+            # Compile (or load from the numba cache) now rather than on the first segment
+            band_lo, band_hi = get_mel_bands()
+            with _mel_logpower_lock:
+                mel_logpower(
+                    np.zeros((1, 1, self.mel_filter.shape[0]), dtype=np.complex64),
+                    self.mel_filter, band_lo, band_hi,
+                    np.empty((1, 1, self.mel_filter.shape[1]), dtype=np.float32), 1e-10
+                )
 
     def transcribe(self, audio, midi_path, setProgressBarValue,
-                   setProgressBarVisibility, setProgressBarFullValue, logUpdate=print):
+                   setProgressBarVisibility, setProgressBarFullValue, logUpdate=print,
+                   batch_size=None):
         """Transcribe audio to MIDI."""
-        audio = audio[None, :]
-
-        audio_len = audio.shape[1]
+        audio_len = audio.shape[0]
         pad_len = int(np.ceil(audio_len / self.segment_samples)) \
             * self.segment_samples - audio_len
 
-        audio = np.concatenate((audio, np.zeros((1, pad_len))), axis=1)
+        # One float32 buffer, already the dtype the front end and model use
+        padded = np.zeros((1, audio_len + pad_len), dtype=np.float32)
+        padded[0, :audio_len] = audio
+        audio = padded
 
         segments = self.enframe(audio, self.segment_samples)
+        segments_num = len(segments)
 
-        output_dict = forward(
-            self.model, segments, batch_size=1,
+        # Each batch is deframed straight into the song-length outputs, so the
+        # overlapping per-segment outputs never exist for the whole song at once
+        output_dict = {}
+        for start, batch_output in iter_forward(
+            self.model, segments, batch_size=self._model_batch_size(batch_size or self.batch_size),
             setProgressBarValue=setProgressBarValue,
             setProgressBarFullValue=setProgressBarFullValue,
             setProgressBarVisibility=setProgressBarVisibility,
             logUpdate=logUpdate,
-            frames_per_second=self.frames_per_second
-        )
+            frames_per_second=self.frames_per_second,
+            mel_filter=self.mel_filter
+        ):
+            for key, block in batch_output.items():
+                out = output_dict.get(key)
+                if out is None:
+                    out = output_dict[key] = np.empty(
+                        (self.deframed_length(block.shape[1], segments_num),) + block.shape[2:],
+                        dtype=block.dtype
+                    )
+                for j in range(len(block)):
+                    self.deframe_segment(out, block[j], start + j, segments_num)
 
         for key in output_dict.keys():
-            output_dict[key] = self.deframe(output_dict[key])[0:audio_len]
+            output_dict[key] = output_dict[key][0:audio_len]
 
         post_processor = RegressionPostProcessor(
             self.frames_per_second, 
@@ -170,33 +303,42 @@ class PianoConverter:
 
         return transcribed_dict
 
+    def _model_batch_size(self, batch_size):
+        """Fall back to one segment per run when the model's batch axis is fixed."""
+        batch_dim = self.model.get_inputs()[0].shape[0]
+        if isinstance(batch_dim, int) and batch_dim > 0:
+            return 1
+        return batch_size
+
     def enframe(self, x, segment_samples):
         """Enframe long sequence to short segments."""
         assert x.shape[1] % segment_samples == 0
-        batch = []
-
-        pointer = 0
-        while pointer + segment_samples <= x.shape[1]:
-            batch.append(x[:, pointer:pointer + segment_samples])
-            pointer += segment_samples // 2
-
-        batch = np.concatenate(batch, axis=0)
-        return batch
-
-    def deframe(self, x):
-        """Deframe predicted segments to original sequence."""
-        if x.shape[0] == 1:
-            return x[0]
+        # Half-overlapping windows as a read-only strided view: nothing is copied here, and
+        # iter_forward() only ever reads segments to build the model input
+        return sliding_window_view(x[0], segment_samples)[::segment_samples // 2]
+
+    def deframed_length(self, frames_num, segments_num):
+        """Length of the song-length output for segments_num segments of frames_num frames."""
+        if segments_num == 1:
+            return frames_num
+        segment_samples = frames_num - 1
+        quarter = segment_samples // 4
+        return 3 * quarter + (segments_num - 2) * 2 * quarter + (segment_samples - quarter)
+
+    def deframe_segment(self, out, segment, index, segments_num):
+        """Write segment number index's share of the song-length output into out."""
+        if segments_num == 1:
+            out[:] = segment
+            return
+        segment_samples = len(segment) - 1
+        quarter = segment_samples // 4
+        three_quarter = 3 * quarter
+        if index == 0:
+            out[:three_quarter] = segment[:three_quarter]
+        elif index == segments_num - 1:
+            offset = three_quarter + (segments_num - 2) * 2 * quarter
+            out[offset:] = segment[quarter:segment_samples]
         else:
-            x = x[:, 0:-1, :]
-            (N, segment_samples, classes_num) = x.shape
-            assert segment_samples % 4 == 0
-
-            y = []
-            y.append(x[0, 0:int(segment_samples * 0.75)])
-            for i in range(1, N - 1):
-                y.append(x[i, int(segment_samples * 0.25):int(segment_samples * 0.75)])
-            y.append(x[-1, int(segment_samples * 0.25):])
-            y = np.concatenate(y, axis=0)
-            return y
+            offset = three_quarter + (index - 1) * 2 * quarter
+            out[offset:offset + 2 * quarter] = segment[quarter:three_quarter]
 
@@ -6,8 +6,58 @@ Uses yt-dlp for reliable YouTube audio extraction.
 import os
 import re
 import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple
+
+
+# A video ID inside a YouTube URL, or a bare 11-character ID
+_VIDEO_ID_RE = re.compile(
+    r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/|youtube\.com/v/)([a-zA-Z0-9_-]{11})'
+    r'|^([a-zA-Z0-9_-]{11})$'
+)
+# Characters not allowed in Windows file names
+_SANITIZE_RE = re.compile(r'[<>:"/\\|?*]')
+
+# yt_dlp takes a noticeable time to import, so it is imported once, on first use
+_yt_dlp = None
+
+
+def _get_yt_dlp():
+    """Return the yt_dlp module, or None if it isn't installed."""
+    global _yt_dlp
+    if _yt_dlp is None:
+        try:
+            import yt_dlp
+        except ImportError:
+            return None
+        _yt_dlp = yt_dlp
+    return _yt_dlp
+
+
+@lru_cache(maxsize=1)
+def _probe_ffmpeg() -> Tuple[bool, Optional[str]]:
+    """Return (available, bundled_directory_or_None), checked once per process."""
+    import subprocess
+    from utils.resources import get_ffmpeg_path
+    
+    # The bundled ffmpeg needs no subprocess to confirm
+    local_ffmpeg = get_ffmpeg_path()
+    if local_ffmpeg.exists():
+        return True, str(local_ffmpeg.parent)
+    
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-version'],
+            capture_output=True,
+            text=True,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+        return result.returncode == 0, None
+    except FileNotFoundError:
+        return False, None
+    except Exception:
+        return False, None
 
 
 class YouTubeConverter:
@@ -20,6 +70,18 @@ class YouTubeConverter:
         self._progress_callback: Optional[Callable[[str, float], None]] = None
         self._log_callback: Optional[Callable[[str, str], None]] = None
         self._cancel_flag = False
+        # Options shared by every download; convert() adds outtmpl and progress_hooks
+        self._ydl_opts_template = {
+            'format': 'bestaudio/best',
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'mp3',
+                'preferredquality': '192',
+            }],
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': False,
+        }
         
     def set_progress_callback(self, callback: Callable[[str, float], None]):
         """Set callback for progress updates."""
@@ -46,79 +108,31 @@ class YouTubeConverter:
         
     def extract_video_id(self, url: str) -> Optional[str]:
         """Extract YouTube video ID from various URL formats."""
-        patterns = [
-            r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/|youtube\.com/v/)([a-zA-Z0-9_-]{11})',
-            r'^([a-zA-Z0-9_-]{11})$'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
+        match = _VIDEO_ID_RE.search(url)
+        if match:
+            return match.group(1) or match.group(2)
         return None
         
     def is_available(self) -> bool:
         """Check if yt-dlp is available."""
-        try:
-            import yt_dlp
-            return True
-        except ImportError:
-            return False
+        return _get_yt_dlp() is not None
     
     def _get_ffmpeg_path(self) -> Optional[str]:
-        """Get path to ffmpeg executable."""
-        import subprocess
-        from utils.resources import get_ffmpeg_path
-        
-        local_ffmpeg = get_ffmpeg_path()
-        if local_ffmpeg.exists():
-            return str(local_ffmpeg.parent)
-        
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-version'],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            )
-            if result.returncode == 0:
-                return None
-        except (FileNotFoundError, Exception):
-            pass
-        
-        return None
+        """Get the ffmpeg directory to pass to yt-dlp (None means use PATH)."""
+        return _probe_ffmpeg()[1]
     
     def is_ffmpeg_available(self) -> bool:
         """Check if ffmpeg is available."""
-        import subprocess
-        from utils.resources import get_ffmpeg_path
-        
-        local_ffmpeg = get_ffmpeg_path()
-        if local_ffmpeg.exists():
-            return True
-        
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-version'],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
-        except Exception:
-            return False
+        return _probe_ffmpeg()[0]
             
     def convert(self, url: str, filename: Optional[str] = None) -> Optional[str]:
         """Convert YouTube video to MP3."""
         self._cancel_flag = False
         
-        if not self.is_available():
+        yt_dlp = _get_yt_dlp()
+        if yt_dlp is None:
             self._log("yt-dlp not installed. Run: pip install yt-dlp", "error")
             return None
-            
-        import yt_dlp
         
         video_id = self.extract_video_id(url)
         if not video_id:
@@ -131,7 +145,7 @@ class YouTubeConverter:
         full_url = f"https://www.youtube.com/watch?v={video_id}"
         
         if filename:
-            filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+            filename = _SANITIZE_RE.sub('_', filename)
             output_template = str(self.output_dir / f"{filename}.%(ext)s")
         else:
             output_template = str(self.output_dir / "%(title)s.%(ext)s")
@@ -151,19 +165,11 @@ class YouTubeConverter:
             elif d['status'] == 'finished':
                 self._update_progress("Converting to MP3...", 75)
                 
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-            'outtmpl': output_template,
-            'progress_hooks': [progress_hook],
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-        }
+        ydl_opts = dict(
+            self._ydl_opts_template,
+            outtmpl=output_template,
+            progress_hooks=[progress_hook],
+        )
         
         ffmpeg_path = self._get_ffmpeg_path()
         if ffmpeg_path:
@@ -200,7 +206,7 @@ class YouTubeConverter:
             if filename:
                 expected_path = self.output_dir / f"{filename}.mp3"
             else:
-                safe_title = re.sub(r'[<>:"/\\|?*]', '_', title)
+                safe_title = _SANITIZE_RE.sub('_', title)
                 expected_path = self.output_dir / f"{safe_title}.mp3"
                 
             if not expected_path.exists():
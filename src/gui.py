@@ -2,15 +2,39 @@
 """
 GUI Application for MIDI to Keyboard Mapping
 Allows interactive assignment of keyboard keys to MIDI notes
+
+Performance notes:
+    The live note path is bound by OS input injection (SendInput / XTest /
+    Quartz events via pynput) and by Tk round-trips, not by Python compute.
+    JIT compilers such as Numba or PyPy do not help here: Numba only
+    accelerates NumPy kernels, and neither speeds up Tk or OS calls.
+    The same holds for MIDI file playback: event data is prepared with
+    NumPy ahead of time, and the per-event work left in the play loop is
+    a list lookup plus the keystroke itself.
+    What does help, and is already in place:
+      - dense 128-slot note tables with key strings parsed ahead of time
+      - draining MIDI input in batches with one Tk callback per batch
+      - sending keystrokes from a dedicated worker thread
+      - skipping config writes when no profile changed
+      - updating only the changed rows of the mappings tree; it holds at
+        most 128 rows (one per MIDI note), so a windowed/virtualized view
+        would add scroll bookkeeping without saving any real work
 """
 
+import hashlib
 import json
+import os
+import queue
+import tempfile
 import threading
 import time
 import tkinter as tk
+import zipfile
+from collections import deque
+from itertools import islice
 from pathlib import Path
-from tkinter import ttk, messagebox, scrolledtext, filedialog
-from typing import Dict, Optional, Set, List, Tuple
+from tkinter import ttk, messagebox, filedialog
+from typing import Deque, Dict, Optional, Set, List, Tuple
 
 try:
     import mido
@@ -18,13 +42,76 @@ except ImportError:
     messagebox.showerror("Error", "mido library not found. Please install it with: pip install mido")
     exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    messagebox.showerror("Error", "numpy library not found. Please install it with: pip install numpy")
+    exit(1)
+
 try:
     from pynput.keyboard import Key, Listener, Controller
 except ImportError:
     messagebox.showerror("Error", "pynput library not found. Please install it with: pip install pynput")
     exit(1)
 
-from src.mapper import MIDIToKeyboardMapper
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from src.mapper import (
+    _VALID_MODIFIERS, MIDIToKeyboardMapper, canonicalize_key, dump_config, encode_config
+)
+
+_PITCH_CLASSES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+# Names for every MIDI note number, e.g. 60 -> "C4"
+_NOTE_NAMES = tuple(f"{_PITCH_CLASSES[i % 12]}{(i // 12) - 1}" for i in range(128))
+
+# pynput modifier keys -> modifier names used in key combination strings
+_MODIFIER_MAP = {
+    Key.ctrl_l: 'ctrl',
+    Key.ctrl_r: 'ctrl',
+    Key.ctrl: 'ctrl',
+    Key.shift_l: 'shift',
+    Key.shift_r: 'shift',
+    Key.shift: 'shift',
+    Key.alt_l: 'alt',
+    Key.alt_r: 'alt',
+    Key.alt: 'alt',
+    Key.cmd: 'cmd',  # Mac command key
+    Key.cmd_l: 'cmd',
+    Key.cmd_r: 'cmd',
+}
+
+# Special key names accepted in key combination strings (modifiers come from src.mapper)
+_VALID_SPECIAL = frozenset({
+    'space', 'enter', 'tab', 'esc', 'backspace', 'delete', 'insert',
+    'up', 'down', 'left', 'right',
+    'home', 'end', 'page_up', 'page_down',
+    'f1', 'f2', 'f3', 'f4', 'f5', 'f6', 'f7', 'f8', 'f9', 'f10', 'f11', 'f12'
+})
+
+# pynput special keys -> key names used in key combination strings
+_SPECIAL_MAP = {
+    Key.space: 'space',
+    Key.enter: 'enter',
+    Key.tab: 'tab',
+    Key.esc: 'esc',
+    Key.backspace: 'backspace',
+    Key.up: 'up',
+    Key.down: 'down',
+    Key.left: 'left',
+    Key.right: 'right',
+    Key.f1: 'f1', Key.f2: 'f2', Key.f3: 'f3', Key.f4: 'f4',
+    Key.f5: 'f5', Key.f6: 'f6', Key.f7: 'f7', Key.f8: 'f8',
+    Key.f9: 'f9', Key.f10: 'f10', Key.f11: 'f11', Key.f12: 'f12',
+    Key.delete: 'delete',
+    Key.insert: 'insert',
+    Key.home: 'home',
+    Key.end: 'end',
+    Key.page_up: 'page_up',
+    Key.page_down: 'page_down',
+}
 
 
 class MIDIFilePlayer:
@@ -34,6 +121,23 @@ class MIDIFilePlayer:
     DEFAULT_BASE_NOTE = 48
     DEFAULT_NOTE_RANGE = 36
     
+    # Minimum seconds between progress callbacks (about one per display frame)
+    PROGRESS_INTERVAL = 1 / 30
+    
+    # Values stored in the event type arrays
+    EVENT_OFF = 0
+    EVENT_ON = 1
+    
+    # Bump when the parsed event format changes so stale cache files are ignored
+    PARSE_CACHE_VERSION = 2
+    # Parsed-event cache files live in their own temp subdirectory, least recently used pruned first
+    PARSE_CACHE_DIR = Path(tempfile.gettempdir()) / "midimap_cache"
+    PARSE_CACHE_MAX_FILES = 64
+    
+    # Parse in tick space and convert to seconds in one vectorized pass;
+    # False uses mido's per-message seconds iterator instead
+    FAST_PARSE = True
+    
     def __init__(self, mapper: MIDIToKeyboardMapper, midi_map: Dict[int, str]):
         self.mapper = mapper  # Use the mapper for key press/release (handles combinations)
         self.midi_map = midi_map
@@ -41,10 +145,34 @@ class MIDIFilePlayer:
         self.paused = False
         self.speed = 1.0
         self.current_file: Optional[str] = None
-        self.original_events: List[Tuple[float, str, int]] = []  # Original events
-        self.events: List[Tuple[float, str, int]] = []  # Adjusted events (time, type, note)
+        # Events as parallel arrays: times (float64 seconds), types (uint8 EVENT_OFF/EVENT_ON), notes (uint8)
+        self.original_times = np.empty(0, dtype=np.float64)
+        self.original_types = np.empty(0, dtype=np.uint8)
+        self.original_notes = np.empty(0, dtype=np.uint8)
+        # Adjusted events; times and types are shared with the originals
+        self.times = self.original_times
+        self.types = self.original_types
+        self.notes = self.original_notes
+        # Cached note-on stats for the adjusted events, refreshed by _update_note_stats()
+        self._on_notes = self.original_notes
+        self._note_count = 0
+        self._mapped_count = 0
+        # Dense note -> key tables so the play loop indexes instead of hashing;
+        # _compiled_table holds the same keys already compiled by the mapper
+        self._key_table: List[Optional[str]] = [None] * 128
+        self._compiled_table: List[Optional[tuple]] = [None] * 128
+        self._mapped_mask = np.zeros(128, dtype=bool)
+        self._build_key_table()
         self.play_thread: Optional[threading.Thread] = None
-        self.active_notes: Set[int] = set()
+        # Set on pause/resume/stop/seek/speed changes to cut the play loop's wait short
+        self._wake = threading.Event()
+        
+        # The play loop only queues (compiled, is_press); a worker does the OS input
+        # injection so a slow keystroke never delays the next scheduled event
+        self._key_q: queue.SimpleQueue = queue.SimpleQueue()
+        self._key_thread = threading.Thread(target=self._key_worker, daemon=True)
+        self._key_thread.start()
+        self.active_mask = 0  # Bit n is set while note n is held
         self.on_progress_callback = None
         self.on_note_callback = None
         self.total_duration = 0.0
@@ -65,32 +193,27 @@ class MIDIFilePlayer:
         self.misclick_enabled = False
         self.misclick_rate = 2.0  # Percentage chance of misclick
         self.misclick_range = 2  # How many notes away a misclick can be
+        # One generator for every playback instead of a new one per play
+        self._rng = np.random.default_rng()
+        # Original note -> misclicked note still held, so the note-off releases the right key
+        self._misclick_mapping: Dict[int, int] = {}
     
     def load_file(self, filepath: str) -> bool:
         """Load a MIDI file and extract note events"""
         try:
-            mid = mido.MidiFile(filepath)
+            cache_path = self._cache_path(filepath)
+            parsed = self._read_cache(cache_path)
+            if parsed is None:
+                parsed = self._parse_file(filepath)
+                self._write_cache(cache_path, parsed)
             self.current_file = filepath
-            self.original_events = []
-            
-            # Convert MIDI to absolute time events
-            current_time = 0.0
-            for msg in mid:
-                current_time += msg.time
-                if msg.type == 'note_on' and msg.velocity > 0:
-                    self.original_events.append((current_time, 'on', msg.note))
-                elif msg.type == 'note_off' or (msg.type == 'note_on' and msg.velocity == 0):
-                    self.original_events.append((current_time, 'off', msg.note))
-            
-            # Sort by time
-            self.original_events.sort(key=lambda x: x[0])
-            self.total_duration = current_time if self.original_events else 0.0
+            self.original_times, self.original_types, self.original_notes, self.total_duration = parsed
             
             # Calculate original note range
-            notes = [e[2] for e in self.original_events if e[1] == 'on']
-            if notes:
-                self.original_min_note = min(notes)
-                self.original_max_note = max(notes)
+            notes = self.original_notes[self.original_types == self.EVENT_ON]
+            if notes.size:
+                self.original_min_note = int(notes.min())
+                self.original_max_note = int(notes.max())
             else:
                 self.original_min_note = 0
                 self.original_max_note = 0
@@ -103,27 +226,172 @@ class MIDIFilePlayer:
             print(f"Error loading MIDI file: {e}")
             return False
     
+    def _parse_file(self, filepath: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """Parse a MIDI file into time-sorted (times, types, notes) arrays and its duration"""
+        mid = mido.MidiFile(filepath)
+        # Type 2 tracks are independent songs; mido rejects merging them either way
+        if self.FAST_PARSE and mid.type != 2:
+            return self._parse_ticks(mid)
+        return self._parse_messages(mid)
+    
+    def _parse_ticks(self, mid) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """Collect note events per track in ticks, then merge and convert to seconds with NumPy"""
+        ticks = []
+        types = []
+        notes = []
+        tempo_ticks = [0]
+        tempos = [500000]  # MIDI default: 120 bpm
+        end_tick = 0
+        EVENT_ON = self.EVENT_ON
+        EVENT_OFF = self.EVENT_OFF
+        
+        # Tracks are appended in order, so a stable sort by tick gives mido's merge order
+        for track in mid.tracks:
+            tick = 0
+            for msg in track:
+                tick += msg.time
+                msg_type = msg.type
+                if msg_type == 'note_on':
+                    ticks.append(tick)
+                    types.append(EVENT_ON if msg.velocity > 0 else EVENT_OFF)
+                    notes.append(msg.note)
+                elif msg_type == 'note_off':
+                    ticks.append(tick)
+                    types.append(EVENT_OFF)
+                    notes.append(msg.note)
+                elif msg_type == 'set_tempo':
+                    tempo_ticks.append(tick)
+                    tempos.append(msg.tempo)
+            end_tick = max(end_tick, tick)
+        
+        # Tempo map: seconds elapsed at each tempo change; ties keep the later change
+        tempo_order = np.argsort(tempo_ticks, kind='stable')
+        tempo_ticks = np.array(tempo_ticks, dtype=np.int64)[tempo_order]
+        seconds_per_tick = np.array(tempos, dtype=np.float64)[tempo_order] / (mid.ticks_per_beat * 1e6)
+        tempo_seconds = np.zeros(tempo_ticks.size)
+        np.cumsum(np.diff(tempo_ticks) * seconds_per_tick[:-1], out=tempo_seconds[1:])
+        
+        def to_seconds(at_ticks: np.ndarray) -> np.ndarray:
+            segment = np.searchsorted(tempo_ticks, at_ticks, side='right') - 1
+            return tempo_seconds[segment] + (at_ticks - tempo_ticks[segment]) * seconds_per_tick[segment]
+        
+        ticks = np.array(ticks, dtype=np.int64)
+        order = np.argsort(ticks, kind='stable')
+        times = to_seconds(ticks[order])
+        duration = float(to_seconds(np.array([end_tick], dtype=np.int64))[0]) if times.size else 0.0
+        return (times, np.array(types, dtype=np.uint8)[order],
+                np.array(notes, dtype=np.uint8)[order], duration)
+    
+    def _parse_messages(self, mid) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """Collect note events with mido's seconds-based message iterator"""
+        times = []
+        types = []
+        notes = []
+        
+        # Convert MIDI to absolute time events
+        current_time = 0.0
+        for msg in mid:
+            current_time += msg.time
+            if msg.type == 'note_on' and msg.velocity > 0:
+                times.append(current_time)
+                types.append(self.EVENT_ON)
+                notes.append(msg.note)
+            elif msg.type == 'note_off' or (msg.type == 'note_on' and msg.velocity == 0):
+                times.append(current_time)
+                types.append(self.EVENT_OFF)
+                notes.append(msg.note)
+        
+        # Sort by time; stable so simultaneous events keep file order
+        times = np.array(times, dtype=np.float64)
+        order = np.argsort(times, kind='stable')
+        return (times[order], np.array(types, dtype=np.uint8)[order],
+                np.array(notes, dtype=np.uint8)[order], current_time if times.size else 0.0)
+    
+    def _cache_path(self, filepath: str) -> Path:
+        """Location of the parsed-event cache for a file, keyed by its path, mtime and size"""
+        path = os.path.abspath(filepath)
+        st = os.stat(path)
+        key = f"{self.PARSE_CACHE_VERSION}|{path}|{st.st_mtime_ns}|{st.st_size}"
+        return self.PARSE_CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.npz"
+    
+    @staticmethod
+    def _read_cache(cache_path: Path):
+        """Return cached (times, types, notes, duration), or None if missing or unreadable"""
+        try:
+            with np.load(cache_path) as data:
+                parsed = data['times'], data['types'], data['notes'], float(data['duration'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Truncated or corrupt; drop it so the next load re-parses and rewrites it
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+            return None
+        try:
+            # Mark as recently used so pruning keeps it
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return parsed
+    
+    def _write_cache(self, cache_path: Path, parsed: Tuple[np.ndarray, np.ndarray, np.ndarray, float]):
+        """Save parsed events; a failed write only costs a re-parse next time"""
+        times, types, notes, duration = parsed
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, times=times, types=types, notes=notes, duration=duration)
+            # Atomic, so another instance never reads a half-written file
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Could not cache parsed MIDI file: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._prune_cache(cache_path.parent)
+    
+    def _prune_cache(self, cache_dir: Path):
+        """Delete the least recently used cache files beyond PARSE_CACHE_MAX_FILES"""
+        entries = []
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith('.npz'):
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except OSError:
+                    pass
+        if len(entries) <= self.PARSE_CACHE_MAX_FILES:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.PARSE_CACHE_MAX_FILES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
     def _apply_note_adjustment(self):
         """Apply note adjustment to fit within the available range"""
-        if not self.original_events:
-            self.events = []
+        self.times = self.original_times
+        self.types = self.original_types
+        if not self.original_times.size:
+            self.notes = self.original_notes
+            self._update_note_stats()
             return
         
         if not self.adjust_notes:
             # No adjustment - use original events
-            self.events = self.original_events.copy()
+            self.notes = self.original_notes
             self.adjusted_min_note = self.original_min_note
             self.adjusted_max_note = self.original_max_note
+            self._update_note_stats()
             return
         
-        # Get all unique notes
-        unique_notes = set(e[2] for e in self.original_events)
-        if not unique_notes:
-            self.events = []
-            return
-        
-        min_note = min(unique_notes)
-        max_note = max(unique_notes)
+        min_note = int(self.original_notes.min())
+        max_note = int(self.original_notes.max())
         original_range = max_note - min_note + 1
         
         # Calculate the optimal transpose amount
@@ -148,36 +416,33 @@ class MIDIFilePlayer:
             # Find the transpose that minimizes the number of notes needing adjustment
             transpose = self.base_note - min_note
         
-        # Create note mapping with octave folding
-        note_mapping = {}
-        for note in unique_notes:
-            adjusted = note + transpose
-            
-            # Octave fold if outside range
-            while adjusted < self.base_note:
-                adjusted += 12  # Move up one octave
-            while adjusted >= self.base_note + self.note_range:
-                adjusted -= 12  # Move down one octave
-            
-            # Final clamp (shouldn't be needed but safety check)
-            adjusted = max(self.base_note, min(self.base_note + self.note_range - 1, adjusted))
-            note_mapping[note] = adjusted
+        low = self.base_note
+        high = self.base_note + self.note_range - 1
+        adjusted = self.original_notes.astype(np.int16) + transpose
         
-        # Apply mapping to all events
-        self.events = []
-        for event_time, event_type, note in self.original_events:
-            adjusted_note = note_mapping.get(note, note)
-            self.events.append((event_time, event_type, adjusted_note))
+        # Octave fold if outside range: whole octaves up from below, down from above
+        adjusted += 12 * (-((adjusted - low) // 12)).clip(min=0)
+        adjusted -= 12 * (-((high - adjusted) // 12)).clip(min=0)
+        
+        # Final clamp (shouldn't be needed but safety check)
+        np.clip(adjusted, low, high, out=adjusted)
+        self.notes = adjusted.astype(np.uint8)
         
         # Calculate adjusted range
-        adjusted_notes = [e[2] for e in self.events if e[1] == 'on']
-        if adjusted_notes:
-            self.adjusted_min_note = min(adjusted_notes)
-            self.adjusted_max_note = max(adjusted_notes)
+        self._update_note_stats()
+        if self._note_count:
+            self.adjusted_min_note = int(self._on_notes.min())
+            self.adjusted_max_note = int(self._on_notes.max())
         else:
             self.adjusted_min_note = self.base_note
             self.adjusted_max_note = self.base_note
     
+    def _update_note_stats(self):
+        """Cache the adjusted note-on notes and their total and mapped counts"""
+        self._on_notes = self.notes[self.types == self.EVENT_ON]
+        self._note_count = int(self._on_notes.size)
+        self._mapped_count = int(np.count_nonzero(self._mapped_mask[self._on_notes]))
+    
     def set_note_adjustment(self, enabled: bool, base_note: int = None, note_range: int = None):
         """Configure note adjustment settings"""
         self.adjust_notes = enabled
@@ -187,11 +452,11 @@ class MIDIFilePlayer:
             self.note_range = max(12, min(88, note_range))  # At least 1 octave, max piano range
         
         # Re-apply adjustment if we have events loaded
-        if self.original_events:
+        if self.original_times.size:
             self._apply_note_adjustment()
     
     def set_misclick_settings(self, enabled: bool = None, rate: float = None, note_range: int = None):
-        """Configure misclick (humanize) settings"""
+        """Configure misclick (humanize) settings; they take effect on the next play or seek"""
         if enabled is not None:
             self.misclick_enabled = enabled
         if rate is not None:
@@ -199,80 +464,99 @@ class MIDIFilePlayer:
         if note_range is not None:
             self.misclick_range = max(1, min(12, note_range))
     
-    def _apply_misclick(self, note: int) -> int:
-        """Possibly apply a random misclick to a note"""
-        import random
-        
+    def _apply_misclick(self, notes: np.ndarray, types: np.ndarray) -> np.ndarray:
+        """Return the note each event plays, with random misclicks drawn up front for every note-on"""
         if not self.misclick_enabled:
-            return note
+            return notes
         
-        # Check if this note should misclick based on rate
-        if random.random() * 100 > self.misclick_rate:
-            return note  # No misclick this time
+        rng = self._rng
+        count = notes.size
         
-        # Apply random offset within range
-        offset = random.randint(-self.misclick_range, self.misclick_range)
-        if offset == 0:
-            offset = random.choice([-1, 1])  # Ensure actual misclick
+        # Check which note-ons misclick based on rate
+        hit = (rng.random(count) * 100 <= self.misclick_rate) & (types == self.EVENT_ON)
         
-        new_note = note + offset
+        # Apply random offset within range
+        offset = rng.integers(-self.misclick_range, self.misclick_range + 1, count)
+        zero = offset == 0
+        offset[zero] = rng.choice((-1, 1), int(zero.sum()))  # Ensure actual misclick
         
         # Keep within MIDI range
-        new_note = max(0, min(127, new_note))
+        played = notes.astype(np.int16) + offset * hit
+        np.clip(played, 0, 127, out=played)
         
-        return new_note
+        return played.astype(np.uint8)
     
     def get_note_range_info(self) -> Dict:
         """Get information about the note range"""
         return {
             'original_min': self.original_min_note,
             'original_max': self.original_max_note,
-            'original_range': self.original_max_note - self.original_min_note + 1 if self.original_events else 0,
+            'original_range': self.original_max_note - self.original_min_note + 1 if self.original_times.size else 0,
             'adjusted_min': self.adjusted_min_note,
             'adjusted_max': self.adjusted_max_note,
-            'adjusted_range': self.adjusted_max_note - self.adjusted_min_note + 1 if self.events else 0,
+            'adjusted_range': self.adjusted_max_note - self.adjusted_min_note + 1 if self.times.size else 0,
             'base_note': self.base_note,
             'available_range': self.note_range,
         }
     
+    def has_events(self) -> bool:
+        """Whether a file with at least one note event is loaded"""
+        return self.times.size > 0
+    
+    def iter_events(self, start: float = 0.0, end: Optional[float] = None):
+        """Yield adjusted (time, 'on'/'off', note) tuples with start <= time <= end"""
+        lo = int(np.searchsorted(self.times, start, side='left'))
+        hi = self.times.size if end is None else int(np.searchsorted(self.times, end, side='right'))
+        for event_time, event_type, note in zip(self.times[lo:hi].tolist(), self.types[lo:hi].tolist(),
+                                                self.notes[lo:hi].tolist()):
+            yield event_time, 'on' if event_type == self.EVENT_ON else 'off', note
+    
     def get_note_count(self) -> int:
         """Get the number of note-on events in the loaded file"""
-        return sum(1 for e in self.events if e[1] == 'on')
+        return self._note_count
     
     def get_mapped_note_count(self) -> int:
         """Get the number of note-on events that have keyboard mappings"""
-        return sum(1 for e in self.events if e[1] == 'on' and e[2] in self.midi_map)
+        return self._mapped_count
     
     def play(self):
         """Start playing the loaded MIDI file"""
-        if not self.events:
+        if not self.times.size:
             return
         
         if self.paused:
-            self.paused = False
+            self.resume()
             return
         
         self.playing = True
         self.paused = False
         self.current_position = 0.0
         self._misclick_mapping = {}  # Reset misclick tracking for new playback
+        self._wake.clear()
         self.play_thread = threading.Thread(target=self._play_loop, daemon=True)
         self.play_thread.start()
     
     def pause(self):
         """Pause playback"""
         self.paused = True
+        self._wake.set()
+    
+    def resume(self):
+        """Resume paused playback"""
+        self.paused = False
+        self._wake.set()
     
     def stop(self):
         """Stop playback and release all keys"""
         self.playing = False
         self.paused = False
+        self._wake.set()
         self._release_all_keys()
         self.current_position = 0.0
     
     def seek_to(self, target_time: float):
         """Seek to a specific time in the MIDI file"""
-        if not self.events:
+        if not self.times.size:
             return
         
         # Clamp target time to valid range
@@ -284,6 +568,7 @@ class MIDIFilePlayer:
         # Stop current playback and release keys
         self.playing = False
         self.paused = False
+        self._wake.set()
         self._release_all_keys()
         
         # Wait for play thread to finish if it's running
@@ -303,89 +588,127 @@ class MIDIFilePlayer:
     
     def _start_from_position(self, start_time: float):
         """Start playback from a specific time position"""
-        if not self.events:
+        if not self.times.size:
             return
         
         self.playing = True
         self.paused = False
         self.current_position = start_time
         self._misclick_mapping = {}
+        self._wake.clear()
         self.play_thread = threading.Thread(
-            target=self._play_loop_from_position, 
+            target=self._play_loop, 
             args=(start_time,), 
             daemon=True
         )
         self.play_thread.start()
     
-    def _play_loop_from_position(self, start_position: float):
-        """Playback loop starting from a specific position"""
+    def _play_loop(self, start_position: float = 0.0):
+        """Playback loop, starting from a given position in seconds"""
         # Find the first event at or after the start position
-        event_index = 0
-        for i, (event_time, _, _) in enumerate(self.events):
-            if event_time >= start_position:
-                event_index = i
-                break
-        else:
+        first = int(np.searchsorted(self.times, start_position, side='left'))
+        if first >= self.times.size:
             # No events after start position, we're at the end
             self.playing = False
             if self.on_progress_callback:
                 self.on_progress_callback(self.total_duration, self.total_duration)
             return
         
+        # Plain lists index much faster than NumPy scalars in the loop below;
+        # only the events still to be played are converted
+        times_arr = self.times[first:]
+        times = times_arr.tolist()
+        types = self.types[first:].tolist()
+        notes = self.notes[first:].tolist()
+        played = self._apply_misclick(self.notes[first:], self.types[first:]).tolist()
+        EVENT_ON = self.EVENT_ON
+        key_table = self._key_table
+        compiled_table = self._compiled_table
+        misclick_mapping = self._misclick_mapping
+        # Bound once; only playing, paused and speed are re-read (other threads change them)
+        perf_counter_ns = time.perf_counter_ns
+        wake = self._wake
+        send_key = self._key_q.put_nowait
+        on_note = self.on_note_callback
+        on_progress = self.on_progress_callback
+        total_duration = self.total_duration
+        progress_interval_ns = int(self.PROGRESS_INTERVAL * 1e9)
+        next_progress_ns = 0
+        # Wall-clock offset of each event at the current speed, in integer
+        # nanoseconds so long playback never loses precision
+        speed = self.speed
+        schedule_ns = (times_arr * (1e9 / speed)).astype(np.int64).tolist()
+        event_index = 0
+        
         # Calculate the time offset
-        time_offset = start_position / self.speed
-        start_time = time.perf_counter() - time_offset
+        time_offset_ns = int(start_position * 1e9 / speed)
+        start_ns = perf_counter_ns() - time_offset_ns
         
-        while self.playing and event_index < len(self.events):
+        event_count = len(times)
+        while self.playing and event_index < event_count:
             if self.paused:
-                pause_start = time.perf_counter()
+                pause_start_ns = perf_counter_ns()
                 while self.paused and self.playing:
-                    time.sleep(0.01)
-                start_time += time.perf_counter() - pause_start
+                    wake.wait()
+                    wake.clear()
+                start_ns += perf_counter_ns() - pause_start_ns
                 continue
             
-            event_time, event_type, note = self.events[event_index]
-            target_time = event_time / self.speed
-            elapsed = time.perf_counter() - start_time
-            
-            wait_time = target_time - elapsed
-            if wait_time > 0:
-                time.sleep(min(wait_time, 0.01))
+            if self.speed != speed:
+                # Re-anchor so playback continues from the same spot at the new speed
+                now_ns = perf_counter_ns()
+                position_ns = (now_ns - start_ns) * speed
+                speed = self.speed
+                start_ns = now_ns - int(position_ns / speed)
+                schedule_ns = (times_arr * (1e9 / speed)).astype(np.int64).tolist()
+            
+            now_ns = perf_counter_ns()
+            elapsed_ns = now_ns - start_ns
+            
+            wait_ns = schedule_ns[event_index] - elapsed_ns
+            if wait_ns > 0:
+                # Sleep until the event is due unless a state change wakes us first
+                if wake.wait(wait_ns * 1e-9):
+                    wake.clear()
                 continue
             
-            # Process event (same as original _play_loop)
-            actual_note = note
-            if event_type == 'on':
-                actual_note = self._apply_misclick(note)
-            
-            if event_type == 'off' and note in self._misclick_mapping:
-                actual_note = self._misclick_mapping.pop(note)
-            
-            if actual_note in self.midi_map:
-                key = self.midi_map[actual_note]
-                try:
-                    if event_type == 'on':
-                        if actual_note != note:
-                            if not hasattr(self, '_misclick_mapping'):
-                                self._misclick_mapping = {}
-                            self._misclick_mapping[note] = actual_note
-                        self.mapper.press_key(key)
-                        self.active_notes.add(actual_note)
-                        if self.on_note_callback:
-                            self.on_note_callback(actual_note, key, True)
-                    else:
-                        self.mapper.release_key(key)
-                        self.active_notes.discard(actual_note)
-                        if self.on_note_callback:
-                            self.on_note_callback(actual_note, key, False)
-                except Exception as e:
-                    print(f"Error sending key '{key}': {e}")
+            # Dispatch every event that is due on this one clock reading (chords, catch-up)
+            while event_index < event_count and schedule_ns[event_index] <= elapsed_ns:
+                event_time = times[event_index]
+                event_type = types[event_index]
+                note = notes[event_index]
+                
+                actual_note = note
+                if event_type == EVENT_ON:
+                    actual_note = played[event_index]
+                
+                if event_type != EVENT_ON and note in misclick_mapping:
+                    actual_note = misclick_mapping.pop(note)
+                
+                key = key_table[actual_note]
+                if key is not None:
+                    try:
+                        if event_type == EVENT_ON:
+                            if actual_note != note:
+                                misclick_mapping[note] = actual_note
+                            send_key((compiled_table[actual_note], True))
+                            self.active_mask |= 1 << actual_note
+                            if on_note:
+                                on_note(actual_note, key, True)
+                        else:
+                            send_key((compiled_table[actual_note], False))
+                            self.active_mask &= ~(1 << actual_note)
+                            if on_note:
+                                on_note(actual_note, key, False)
+                    except Exception as e:
+                        print(f"Error sending key '{key}': {e}")
+                
+                event_index += 1
             
             self.current_position = event_time
-            if self.on_progress_callback:
-                self.on_progress_callback(event_time, self.total_duration)
-            
-            event_index += 1
+            if on_progress and now_ns >= next_progress_ns:
+                on_progress(event_time, total_duration)
+                next_progress_ns = now_ns + progress_interval_ns
         
         self._release_all_keys()
         self.playing = False
@@ -395,90 +718,58 @@ class MIDIFilePlayer:
     def set_speed(self, speed: float):
         """Set playback speed (0.25 to 4.0)"""
         self.speed = max(0.25, min(4.0, speed))
+        self._wake.set()
     
     def update_midi_map(self, midi_map: Dict[int, str]):
         """Update the MIDI to keyboard mapping"""
         self.midi_map = midi_map
+        self._build_key_table()
+    
+    def _build_key_table(self):
+        """Rebuild the 128-slot key table and mapped-note mask from midi_map"""
+        key_table, compiled_table = self.mapper.compile_note_table(self.midi_map)
+        # Update in place so a running play loop sees the new keys
+        self._key_table[:] = key_table
+        self._compiled_table[:] = compiled_table
+        self._mapped_mask = np.array([key is not None for key in key_table], dtype=bool)
+        self._mapped_count = int(np.count_nonzero(self._mapped_mask[self._on_notes]))
     
     def _release_all_keys(self):
         """Release all currently pressed keys"""
-        for note in list(self.active_notes):
-            if note in self.midi_map:
-                try:
-                    self.mapper.release_key(self.midi_map[note])
-                except:
-                    pass
-        self.active_notes.clear()
+        # Queued behind any pending presses, so nothing is pressed after its release
+        compiled_table = self._compiled_table
+        mask = self.active_mask
+        self.active_mask = 0
+        while mask:
+            # Lowest set bit first
+            bit = mask & -mask
+            mask ^= bit
+            compiled = compiled_table[bit.bit_length() - 1]
+            if compiled is not None:
+                self._key_q.put_nowait((compiled, False))
+    
+    def _key_worker(self):
+        """Send queued (compiled, is_press) keystrokes until a None sentinel is received"""
+        press = self.mapper.press_compiled
+        release = self.mapper.release_compiled
+        while True:
+            item = self._key_q.get()
+            if item is None:
+                return
+            compiled, is_press = item
+            try:
+                if is_press:
+                    press(compiled)
+                else:
+                    release(compiled)
+            except Exception as e:
+                print(f"Error sending key: {e}")
     
-    def _play_loop(self):
-        """Main playback loop"""
-        start_time = time.perf_counter()
-        event_index = 0
-        
-        while self.playing and event_index < len(self.events):
-            if self.paused:
-                pause_start = time.perf_counter()
-                while self.paused and self.playing:
-                    time.sleep(0.01)
-                # Adjust start time for pause duration
-                start_time += time.perf_counter() - pause_start
-                continue
-            
-            event_time, event_type, note = self.events[event_index]
-            
-            # Calculate when this event should happen
-            target_time = event_time / self.speed
-            elapsed = time.perf_counter() - start_time
-            
-            # Wait until it's time for this event
-            wait_time = target_time - elapsed
-            if wait_time > 0:
-                time.sleep(min(wait_time, 0.01))
-                continue
-            
-            # Process the event
-            # Apply misclick for note-on events (note-off uses original note to release)
-            actual_note = note
-            if event_type == 'on':
-                actual_note = self._apply_misclick(note)
-            
-            # For note-off, find the corresponding note that was pressed
-            if event_type == 'off' and note in self._misclick_mapping:
-                actual_note = self._misclick_mapping.pop(note)
-            
-            if actual_note in self.midi_map:
-                key = self.midi_map[actual_note]
-                try:
-                    if event_type == 'on':
-                        # Track which misclicked note corresponds to which original
-                        if actual_note != note:
-                            if not hasattr(self, '_misclick_mapping'):
-                                self._misclick_mapping = {}
-                            self._misclick_mapping[note] = actual_note
-                        
-                        self.mapper.press_key(key)
-                        self.active_notes.add(actual_note)
-                        if self.on_note_callback:
-                            self.on_note_callback(actual_note, key, True)
-                    else:
-                        self.mapper.release_key(key)
-                        self.active_notes.discard(actual_note)
-                        if self.on_note_callback:
-                            self.on_note_callback(actual_note, key, False)
-                except Exception as e:
-                    print(f"Error sending key '{key}': {e}")
-            
-            self.current_position = event_time
-            if self.on_progress_callback:
-                self.on_progress_callback(event_time, self.total_duration)
-            
-            event_index += 1
-        
-        # Playback finished
-        self._release_all_keys()
-        self.playing = False
-        if self.on_progress_callback:
-            self.on_progress_callback(self.total_duration, self.total_duration)
+    def close(self):
+        """Stop playback, release keys and stop the key worker"""
+        self.stop()
+        self._key_q.put_nowait(None)
+        self._key_thread.join(timeout=0.5)
 
 
 class MIDIMapperGUI:
@@ -502,6 +793,16 @@ class MIDIMapperGUI:
         'button_hover': '#ff6b6b',
     }
     
+    # Number of recent notes shown in the detection panel
+    RECENT_NOTES_SHOWN = 5
+    
+    # Debounce windows (ms) for coalescing display refreshes and saves on rapid edits
+    REFRESH_DEBOUNCE_MS = 50
+    SAVE_DEBOUNCE_MS = 200
+    
+    # Canonical modifier order used when building key combination strings
+    _MOD_ORDER = ('ctrl', 'shift', 'alt', 'cmd')
+    
     def __init__(self, root: tk.Tk):
         self.root = root
         self.root.title("MIDI to Keyboard Mapper")
@@ -520,11 +821,26 @@ class MIDIMapperGUI:
         self.mapper.config_path = self.config_path
         self.mapper.keyboard = PlatformKeyboard()
         self.mapper.midi_map = {}
-        self.mapper.active_notes = {}
+        self.mapper.midi_map_arr = [None] * 128
+        self.mapper.actions_arr = [None] * 128
+        self.mapper.active_mask = 0
         self.mapper.current_port = None
         self.mapper.velocity_threshold = 0
+        self.mapper.verbose = False
+        self.mapper._log_ring = deque(maxlen=256)
         self.midi_map: Dict[int, str] = {}
-        self.active_notes: Set[int] = set()
+        # Dense per-note lookup table mirroring self.midi_map for the MIDI hot path
+        self._map_arr: List[Optional[str]] = [None] * 128
+        self._compiled: List[Optional[tuple]] = [None] * 128
+        # (key, compiled) of each held note; owned by the key worker thread
+        self._held: List[Optional[tuple]] = [None] * 128
+        
+        # The MIDI thread only queues (note, is_on) events; a dedicated worker
+        # looks up mappings and does the OS input injection, so neither the
+        # MIDI thread nor the Tk event loop ever blocks on a keystroke
+        self._key_q: queue.SimpleQueue = queue.SimpleQueue()
+        self._key_thread = threading.Thread(target=self._key_worker, daemon=True)
+        self._key_thread.start()
         
         self.midi_port: Optional[mido.ports.BaseInput] = None
         self.midi_listener_thread: Optional[threading.Thread] = None
@@ -534,12 +850,25 @@ class MIDIMapperGUI:
         self.keyboard_listener: Optional[Listener] = None
         self.capturing_key = False
         self.selected_midi_note: Optional[int] = None
-        self.recent_midi_notes: list = []
+        self.recent_midi_notes: Deque[Tuple[int, str, int]] = deque(maxlen=10)
         self.pressed_modifiers: Set[str] = set()
         self.waiting_for_key = False
         
         self.current_profile: str = "default"
         self.profiles: Dict[str, Dict[int, str]] = {}
+        # Profiles changed since the last write, and the bytes of that write
+        self._dirty: Set[str] = set()
+        self._json_cache: Optional[bytes] = None
+        # Pending after() ids for debounced display refreshes and saves
+        self._refresh_after: Optional[str] = None
+        self._save_after: Optional[str] = None
+        self._scrollregion_after: Optional[str] = None
+        # Row values currently shown in the mappings tree, by MIDI note (at most 128 rows)
+        self._tree_state: Dict[int, Tuple[str, str, str]] = {}
+        # Rows detached from the tree (e.g. by a profile switch), kept for reuse
+        self._tree_detached: Dict[int, Tuple[str, str, str]] = {}
+        # Parsed config keyed by file mtime (ns)
+        self._config_cache: Optional[Tuple[int, dict]] = None
         
         self.setup_ui()
         self.load_all_profiles()
@@ -693,7 +1022,9 @@ class MIDIMapperGUI:
         
         # Bind events for scrolling
         def on_frame_configure(event):
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            # Resizes come in bursts while widgets update; recompute once when Tk goes idle
+            if self._scrollregion_after is None:
+                self._scrollregion_after = self.root.after_idle(self._update_scrollregion)
         
         def on_canvas_configure(event):
             self.canvas.itemconfig(self.canvas_window, width=event.width)
@@ -705,7 +1036,19 @@ class MIDIMapperGUI:
         def on_mousewheel(event):
             self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
         
-        self.canvas.bind_all("<MouseWheel>", on_mousewheel)
+        # Only listen for the wheel while the pointer is over the scrollable area
+        def on_canvas_enter(event):
+            self.canvas.bind_all("<MouseWheel>", on_mousewheel)
+        
+        def on_canvas_leave(event):
+            # Moving onto a child widget also sends <Leave>; keep the binding unless the pointer left the canvas
+            x, y = self.canvas.winfo_pointerxy()
+            widget = self.canvas.winfo_containing(x, y)
+            if widget is None or not str(widget).startswith(str(self.canvas)):
+                self.canvas.unbind_all("<MouseWheel>")
+        
+        self.canvas.bind("<Enter>", on_canvas_enter)
+        self.canvas.bind("<Leave>", on_canvas_leave)
         
         # Profile Selection
         profile_frame = ttk.LabelFrame(main_frame, text="Profile", padding="5")
@@ -744,13 +1087,12 @@ class MIDIMapperGUI:
         detection_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
         
         ttk.Label(detection_frame, text="Last detected notes:").grid(row=0, column=0, padx=5)
-        self.last_notes_text = scrolledtext.ScrolledText(
-            detection_frame, height=3, width=60, state="disabled",
-            bg=self.COLORS['input_bg'], fg=self.COLORS['text'],
-            insertbackground=self.COLORS['text'], font=('Segoe UI', 9),
-            relief='flat', borderwidth=2
+        self.last_notes_label = ttk.Label(
+            detection_frame, text="\n" * (self.RECENT_NOTES_SHOWN - 1), width=60,
+            justify=tk.LEFT, anchor=tk.NW, background=self.COLORS['input_bg'],
+            padding=(4, 2)
         )
-        self.last_notes_text.grid(row=0, column=1, columnspan=2, padx=5, sticky=(tk.W, tk.E))
+        self.last_notes_label.grid(row=0, column=1, columnspan=2, padx=5, sticky=(tk.W, tk.E))
         detection_frame.columnconfigure(1, weight=1)
         
         # Key Assignment Section
@@ -859,6 +1201,9 @@ class MIDIMapperGUI:
         # Seek bar (clickable progress slider)
         self.progress_var = tk.DoubleVar(value=0)
         self._user_seeking = False  # Track if user is dragging the seek bar
+        # Latest (note, key, is_on) from the player, shown by one pending after() call
+        self._player_note: Optional[Tuple[int, str, bool]] = None
+        self._player_note_after = None
         self.seek_scale = ttk.Scale(
             player_frame, from_=0, to=100, variable=self.progress_var,
             orient=tk.HORIZONTAL, command=self._on_seek_scale_changed
@@ -1069,8 +1414,16 @@ class MIDIMapperGUI:
             return
         
         try:
-            with open(self.config_path, 'r') as f:
-                config = json.load(f)
+            mtime = self.config_path.stat().st_mtime_ns
+            if self._config_cache is not None and self._config_cache[0] == mtime:
+                config = self._config_cache[1]
+            else:
+                raw = self.config_path.read_bytes()
+                config = orjson.loads(raw) if orjson is not None else json.loads(raw)
+                self._config_cache = (mtime, config)
+                # The file on disk is the last-written state until something changes
+                self._json_cache = raw
+                self._dirty.clear()
             
             # Check if it's the new profile-based format
             if "profiles" in config:
@@ -1079,14 +1432,15 @@ class MIDIMapperGUI:
                 for profile_name, profile_data in profiles_data.items():
                     midi_map = profile_data.get("midi_map", {})
                     # Convert string keys to integers
-                    self.profiles[profile_name] = {int(k): v for k, v in midi_map.items()}
+                    self.profiles[profile_name] = {int(k): canonicalize_key(v) for k, v in midi_map.items()}
                 self.current_profile = config.get("current_profile", "default")
             else:
                 # Old format - migrate to profiles
                 old_midi_map = config.get("midi_map", {})
-                old_midi_map = {int(k): v for k, v in old_midi_map.items()}
+                old_midi_map = {int(k): canonicalize_key(v) for k, v in old_midi_map.items()}
                 self.profiles = {"default": old_midi_map}
                 self.current_profile = "default"
+                self._mark_dirty("default")
                 self.save_all_profiles()
             
             # Ensure default profile exists
@@ -1108,8 +1462,16 @@ class MIDIMapperGUI:
             self.profile_combo['values'] = ["default"]
             self.profile_var.set("default")
     
+    def _mark_dirty(self, profile_name: Optional[str] = None):
+        """Flag a profile as changed so the next save re-serializes the config"""
+        self._dirty.add(profile_name or self.current_profile)
+    
     def save_all_profiles(self):
         """Save all profiles to config file"""
+        # Nothing changed since the last write
+        if not self._dirty and self._json_cache is not None:
+            return True
+        
         try:
             profiles_data = {}
             for profile_name, midi_map in self.profiles.items():
@@ -1124,9 +1486,14 @@ class MIDIMapperGUI:
                 "description": "MIDI note number (0-127) maps to keyboard key"
             }
             
-            with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            data = encode_config(config)
+            # Changes that cancel out leave the file as it is
+            if data != self._json_cache:
+                dump_config(self.config_path, data)
+                self._config_cache = None
             
+            self._json_cache = data
+            self._dirty.clear()
             return True
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save profiles: {e}")
@@ -1139,12 +1506,12 @@ class MIDIMapperGUI:
                 profile_name = "default"
             else:
                 profile_name = list(self.profiles.keys())[0] if self.profiles else "default"
-                if profile_name not in self.profiles:
-                    self.profiles[profile_name] = {}
         
         self.current_profile = profile_name
-        self.midi_map = self.profiles[profile_name].copy()
-        self.mapper.midi_map = self.midi_map.copy()
+        # The GUI, mapper and profiles dict share one mapping dict per profile
+        self.midi_map = self.profiles.setdefault(profile_name, {})
+        self.mapper.midi_map = self.midi_map
+        self._rebuild_note_table()
         
         # Update MIDI file player if it exists
         if hasattr(self, 'midi_player'):
@@ -1160,13 +1527,12 @@ class MIDIMapperGUI:
             messagebox.showwarning("Warning", f"Profile '{profile_name}' not found")
             return
         
-        # Save current profile's mappings before switching
-        self.profiles[self.current_profile] = self.midi_map.copy()
-        
-        # Load new profile
+        # Load new profile (edits to the old one already live in self.profiles)
         self.current_profile = profile_name
-        self.midi_map = self.profiles[profile_name].copy()
-        self.mapper.midi_map = self.midi_map.copy()
+        self._mark_dirty(profile_name)
+        self.midi_map = self.profiles[profile_name]
+        self.mapper.midi_map = self.midi_map
+        self._rebuild_note_table()
         
         # Update MIDI file player
         if hasattr(self, 'midi_player'):
@@ -1209,11 +1575,9 @@ class MIDIMapperGUI:
                 messagebox.showwarning("Warning", f"Profile '{name}' already exists")
                 return
             
-            # Save current profile
-            self.profiles[self.current_profile] = self.midi_map.copy()
-            
             # Create new profile
             self.profiles[name] = {}
+            self._mark_dirty(name)
             self.profile_combo['values'] = list(self.profiles.keys())
             self.save_all_profiles()
             self.switch_profile(name)
@@ -1262,16 +1626,11 @@ class MIDIMapperGUI:
                 messagebox.showwarning("Warning", f"Profile '{new_name}' already exists")
                 return
             
-            # Save current mappings
-            mappings = self.midi_map.copy()
-            
-            # Remove old profile
-            del self.profiles[self.current_profile]
-            
-            # Create new profile with mappings
-            self.profiles[new_name] = mappings
+            # Move the mappings dict over to the new name
+            self.profiles[new_name] = self.profiles.pop(self.current_profile)
             self.profile_combo['values'] = list(self.profiles.keys())
             self.current_profile = new_name
+            self._mark_dirty(new_name)
             self.profile_var.set(new_name)
             self.save_all_profiles()
             dialog.destroy()
@@ -1295,11 +1654,9 @@ class MIDIMapperGUI:
         if not messagebox.askyesno("Confirm", f"Delete profile '{self.current_profile}'?\nThis cannot be undone."):
             return
         
-        # Save current profile before deletion
-        self.profiles[self.current_profile] = self.midi_map.copy()
-        
         # Delete profile
         del self.profiles[self.current_profile]
+        self._mark_dirty()
         
         # Switch to default or first available
         if "default" in self.profiles:
@@ -1340,6 +1697,12 @@ class MIDIMapperGUI:
     def disconnect_midi(self):
         """Disconnect from MIDI port"""
         self.running = False
+        # The listener polls, so it exits within one poll interval; wait for it
+        # before closing the port it is reading from
+        thread = self.midi_listener_thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=0.5)
+        self.midi_listener_thread = None
         if self.midi_port:
             self.midi_port.close()
             self.midi_port = None
@@ -1354,72 +1717,112 @@ class MIDIMapperGUI:
         self.midi_listener_thread.start()
     
     def midi_listener_loop(self):
-        """Listen to MIDI messages in a loop"""
-        if not self.midi_port:
+        """Poll the MIDI port, send mapped keys and batch display updates to the UI thread"""
+        port = self.midi_port
+        if not port:
             return
         
         try:
-            for message in self.midi_port:
-                if not self.running:
-                    break
+            while self.running:
+                # Drain everything that arrived since the last poll so a chord
+                # costs one Tk callback instead of one per note
+                batch = []
+                put = self._key_q.put_nowait
+                for message in port.iter_pending():
+                    if message.type == 'note_on' and message.velocity > 0:
+                        put((message.note, True))
+                        batch.append((message.note, message.velocity))
+                    elif message.type == 'note_off' or (message.type == 'note_on' and message.velocity == 0):
+                        put((message.note, False))
                 
-                if message.type == 'note_on' and message.velocity > 0:
-                    self.root.after(0, self.on_midi_note, message.note, message.velocity)
-                elif message.type == 'note_off' or (message.type == 'note_on' and message.velocity == 0):
-                    self.root.after(0, self.on_midi_note_off, message.note)
+                if batch:
+                    self.root.after(0, self._drain_batch, batch)
+                time.sleep(0.001)
         except Exception as e:
             if self.running:
                 self.root.after(0, lambda: messagebox.showerror("Error", f"MIDI listener error: {e}"))
     
+    def _key_worker(self):
+        """Turn queued (note, is_on) events into key presses until a None sentinel is received"""
+        held = self._held
+        while True:
+            item = self._key_q.get()
+            if item is None:
+                return
+            note, is_on = item
+            if note < 0:
+                # Queued by toggle_mapping when mapping is switched off
+                self._release_held()
+                continue
+            
+            if is_on:
+                # Read the table once: it is swapped in whole when mappings change
+                compiled = self._compiled[note]
+                if not self.mapping_enabled or compiled is None or held[note] is not None:
+                    continue
+                key = self._map_arr[note]
+                held[note] = (key, compiled)
+                try:
+                    self.mapper.press_compiled(compiled)
+                    print(f"Sent key press: '{key}'")
+                except Exception as e:
+                    print(f"Error sending key '{key}': {e}")
+            else:
+                # Release what was pressed, even if the mapping changed since
+                entry = held[note]
+                if entry is not None:
+                    held[note] = None
+                    self._release_entry(entry)
+    
+    def _release_entry(self, entry: tuple):
+        """Release a held (key, compiled) entry (key worker thread only)"""
+        key, compiled = entry
+        try:
+            self.mapper.release_compiled(compiled)
+            print(f"Sent key release: '{key}'")
+        except Exception as e:
+            print(f"Error sending key '{key}': {e}")
+    
+    def _release_held(self):
+        """Release every held note (key worker thread only)"""
+        held = self._held
+        for note in range(128):
+            entry = held[note]
+            if entry is not None:
+                held[note] = None
+                self._release_entry(entry)
+    
+    def _drain_batch(self, batch: List[Tuple[int, int]]):
+        """Update the note display for a batch of (note, velocity) note-on events"""
+        for note, velocity in batch:
+            self.on_midi_note(note, velocity)
+        self._refresh_recent_notes()
+    
     def on_midi_note(self, note: int, velocity: int):
-        """Handle incoming MIDI note on event"""
+        """Handle incoming MIDI note on event (display and note detection)"""
         note_name = self.get_note_name(note)
         
-        # Add to recent notes
-        self.recent_midi_notes.insert(0, (note, note_name, velocity))
-        if len(self.recent_midi_notes) > 10:
-            self.recent_midi_notes.pop()
-        
-        # Update UI
-        self.last_notes_text.config(state="normal")
-        self.last_notes_text.delete(1.0, tk.END)
-        for n, name, vel in self.recent_midi_notes[:5]:
-            self.last_notes_text.insert(tk.END, f"Note {n} ({name}) - Velocity: {vel}\n")
-        self.last_notes_text.config(state="disabled")
+        # Add to recent notes (the label is refreshed once per batch)
+        self.recent_midi_notes.appendleft((note, note_name, velocity))
         
         # If detecting, update selected note
         if self.selected_midi_note is None:
             self.selected_midi_note = note
             self.midi_note_var.set(str(note))
-        
-        # If mapping is enabled, trigger keyboard key
-        if self.mapping_enabled and note in self.midi_map:
-            key = self.midi_map[note]
-            if note not in self.active_notes:
-                self.active_notes.add(note)
-                try:
-                    self.mapper.press_key(key)
-                    print(f"Sent key press: MIDI {note} -> '{key}'")
-                except Exception as e:
-                    print(f"Error sending key '{key}' for MIDI note {note}: {e}")
     
-    def on_midi_note_off(self, note: int):
-        """Handle incoming MIDI note off event"""
-        if self.mapping_enabled and note in self.midi_map:
-            if note in self.active_notes:
-                self.active_notes.remove(note)
-                try:
-                    self.mapper.release_key(self.midi_map[note])
-                    print(f"Sent key release: MIDI {note} -> '{self.midi_map[note]}'")
-                except Exception as e:
-                    print(f"Error releasing key '{self.midi_map[note]}' for MIDI note {note}: {e}")
+    def _refresh_recent_notes(self):
+        """Show the most recent notes in the detection label"""
+        lines = [f"Note {n} ({name}) - Velocity: {vel}"
+                 for n, name, vel in islice(self.recent_midi_notes, self.RECENT_NOTES_SHOWN)]
+        # Pad to a fixed line count so the layout doesn't jump
+        lines += [""] * (self.RECENT_NOTES_SHOWN - len(lines))
+        self.last_notes_label.configure(text="\n".join(lines))
     
     def get_note_name(self, note: int) -> str:
         """Get the musical note name from MIDI note number"""
-        note_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        octave = (note // 12) - 1
-        note_name = note_names[note % 12]
-        return f"{note_name}{octave}"
+        if 0 <= note < 128:
+            return _NOTE_NAMES[note]
+        return f"{_PITCH_CLASSES[note % 12]}{(note // 12) - 1}"
     
     def use_last_note(self):
         """Use the last detected MIDI note"""
@@ -1473,7 +1876,7 @@ class MIDIMapperGUI:
         if modifier:
             if modifier not in self.pressed_modifiers:
                 self.pressed_modifiers.add(modifier)
-                modifiers_str = "+".join(sorted(self.pressed_modifiers))
+                modifiers_str = self._modifiers_str()
                 self.root.after(0, lambda: self.capture_status_label.config(
                     text=f"Hold: {modifiers_str}... (press another key)"
                 ))
@@ -1484,7 +1887,7 @@ class MIDIMapperGUI:
         if key_str:
             # Combine modifiers with the key
             if self.pressed_modifiers:
-                modifiers_str = "+".join(sorted(self.pressed_modifiers))
+                modifiers_str = self._modifiers_str()
                 final_key = f"{modifiers_str}+{key_str}"
             else:
                 final_key = key_str
@@ -1495,6 +1898,11 @@ class MIDIMapperGUI:
         
         return True
     
+    def _modifiers_str(self) -> str:
+        """Join the held modifiers in canonical order, e.g. 'ctrl+shift'"""
+        pressed = self.pressed_modifiers
+        return "+".join([m for m in self._MOD_ORDER if m in pressed])
+    
     def on_key_release(self, key):
         """Handle keyboard key release during capture"""
         if not self.capturing_key:
@@ -1510,48 +1918,14 @@ class MIDIMapperGUI:
     def get_modifier(self, key) -> Optional[str]:
         """Get modifier name if key is a modifier"""
         if isinstance(key, Key):
-            modifier_map = {
-                Key.ctrl_l: 'ctrl',
-                Key.ctrl_r: 'ctrl',
-                Key.ctrl: 'ctrl',
-                Key.shift_l: 'shift',
-                Key.shift_r: 'shift',
-                Key.shift: 'shift',
-                Key.alt_l: 'alt',
-                Key.alt_r: 'alt',
-                Key.alt: 'alt',
-                Key.cmd: 'cmd',  # Mac command key
-                Key.cmd_l: 'cmd',
-                Key.cmd_r: 'cmd',
-            }
-            return modifier_map.get(key)
+            return _MODIFIER_MAP.get(key)
         return None
     
     def format_key(self, key, include_modifiers: bool = True) -> Optional[str]:
         """Format a pynput key to string representation"""
         if isinstance(key, Key):
-            # Map special keys (excluding modifiers which are handled separately)
-            special_map = {
-                Key.space: 'space',
-                Key.enter: 'enter',
-                Key.tab: 'tab',
-                Key.esc: 'esc',
-                Key.backspace: 'backspace',
-                Key.up: 'up',
-                Key.down: 'down',
-                Key.left: 'left',
-                Key.right: 'right',
-                Key.f1: 'f1', Key.f2: 'f2', Key.f3: 'f3', Key.f4: 'f4',
-                Key.f5: 'f5', Key.f6: 'f6', Key.f7: 'f7', Key.f8: 'f8',
-                Key.f9: 'f9', Key.f10: 'f10', Key.f11: 'f11', Key.f12: 'f12',
-                Key.delete: 'delete',
-                Key.insert: 'insert',
-                Key.home: 'home',
-                Key.end: 'end',
-                Key.page_up: 'page_up',
-                Key.page_down: 'page_down',
-            }
-            return special_map.get(key)
+            # Special keys (modifiers are handled separately)
+            return _SPECIAL_MAP.get(key)
         else:
             # Regular character
             try:
@@ -1591,9 +1965,6 @@ class MIDIMapperGUI:
         if not key_str:
             return False
         
-        # Valid modifiers
-        valid_modifiers = {'ctrl', 'shift', 'alt'}
-        
         # Split by '+'
         parts = key_str.split('+')
         
@@ -1601,7 +1972,7 @@ class MIDIMapperGUI:
         if len(parts) > 1:
             modifiers = parts[:-1]
             for mod in modifiers:
-                if mod not in valid_modifiers:
+                if mod not in _VALID_MODIFIERS:
                     return False
         
         # Last part should be a valid key (single character or special key)
@@ -1612,17 +1983,7 @@ class MIDIMapperGUI:
             return True
         
         # Check if it's a valid special key
-        valid_special = {
-            'space', 'enter', 'tab', 'esc', 'backspace', 'delete', 'insert',
-            'up', 'down', 'left', 'right',
-            'home', 'end', 'page_up', 'page_down',
-            'f1', 'f2', 'f3', 'f4', 'f5', 'f6', 'f7', 'f8', 'f9', 'f10', 'f11', 'f12'
-        }
-        
-        if last_part in valid_special:
-            return True
-        
-        return False
+        return last_part in _VALID_SPECIAL
     
     def assign_key(self):
         """Assign the keyboard key to the selected MIDI note"""
@@ -1642,7 +2003,7 @@ class MIDIMapperGUI:
             return
         
         # Normalize the key string (lowercase, handle spaces)
-        key_str = key_str.lower().replace(" ", "")
+        key_str = canonicalize_key(key_str)
         
         # Validate the key combination format
         if not self.validate_key_combination(key_str):
@@ -1655,15 +2016,15 @@ class MIDIMapperGUI:
         
         # Add to mapping
         self.midi_map[midi_note] = key_str
-        self.mapper.midi_map = self.midi_map.copy()
-        # Update profile storage
-        self.profiles[self.current_profile] = self.midi_map.copy()
+        self._rebuild_note_table()
+        self._mark_dirty()
         # Update MIDI file player
         if hasattr(self, 'midi_player'):
             self.midi_player.update_midi_map(self.midi_map)
         
-        # Update display
-        self.update_mappings_display()
+        # Update display and autosave (both coalesced across rapid edits)
+        self.schedule_refresh()
+        self.schedule_save()
         
         # Clear fields
         self.midi_note_var.set("")
@@ -1694,50 +2055,105 @@ class MIDIMapperGUI:
         
         if midi_note in self.midi_map:
             del self.midi_map[midi_note]
-            self.mapper.midi_map = self.midi_map.copy()
-            # Update profile storage
-            self.profiles[self.current_profile] = self.midi_map.copy()
+            self._rebuild_note_table()
+            self._mark_dirty()
             # Update MIDI file player
             if hasattr(self, 'midi_player'):
                 self.midi_player.update_midi_map(self.midi_map)
-            self.update_mappings_display()
+            self.schedule_refresh()
+            self.schedule_save()
     
     def clear_all_mappings(self):
         """Clear all mappings in current profile"""
         if messagebox.askyesno("Confirm", f"Clear all mappings in profile '{self.current_profile}'?"):
             self.midi_map.clear()
-            self.mapper.midi_map.clear()
-            # Update profile storage
-            self.profiles[self.current_profile] = {}
+            self._rebuild_note_table()
+            self._mark_dirty()
             # Update MIDI file player
             if hasattr(self, 'midi_player'):
                 self.midi_player.update_midi_map(self.midi_map)
-            self.update_mappings_display()
+            self.schedule_refresh()
+            self.schedule_save()
+    
+    def _update_scrollregion(self):
+        """Fit the canvas scroll region to its contents"""
+        self._scrollregion_after = None
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+    
+    def schedule_refresh(self):
+        """Refresh the mappings display once edits stop arriving"""
+        if self._refresh_after is not None:
+            self.root.after_cancel(self._refresh_after)
+        self._refresh_after = self.root.after(self.REFRESH_DEBOUNCE_MS, self._do_refresh)
+    
+    def _do_refresh(self):
+        """Run a scheduled mappings display refresh"""
+        self._refresh_after = None
+        self.update_mappings_display()
+    
+    def schedule_save(self):
+        """Save profiles once edits stop arriving"""
+        if self._save_after is not None:
+            self.root.after_cancel(self._save_after)
+        self._save_after = self.root.after(self.SAVE_DEBOUNCE_MS, self._do_save)
+    
+    def _do_save(self):
+        """Run a scheduled profile save"""
+        self._save_after = None
+        self.save_all_profiles()
+    
+    def _rebuild_note_table(self):
+        """Rebuild the dense note->key tables used by the MIDI input handlers"""
+        self._map_arr, self._compiled = self.mapper.compile_note_table(self.midi_map)
     
     def update_mappings_display(self):
         """Update the mappings tree display"""
-        # Clear existing items
-        for item in self.mappings_tree.get_children():
-            self.mappings_tree.delete(item)
-        
-        # Add current mappings
-        for midi_note in sorted(self.midi_map.keys()):
-            note_name = self.get_note_name(midi_note)
-            key = self.midi_map[midi_note]
-            self.mappings_tree.insert("", tk.END, values=(str(midi_note), note_name, key))
+        tree = self.mappings_tree
+        shown = self._tree_state
+        detached = self._tree_detached
+        midi_map = self.midi_map
+        
+        # Only touch rows that changed since the last render (row iid is the note number)
+        stale = shown.keys() - midi_map.keys()
+        if stale:
+            # Detach rather than delete so the items can be reattached later; one Tk call each
+            iids = [str(n) for n in stale]
+            tree.selection_remove(*iids)
+            tree.detach(*iids)
+            for midi_note in stale:
+                detached[midi_note] = shown.pop(midi_note)
+        
+        # The dense note table is already in note order, so no sort is needed
+        index = 0
+        for midi_note, key in enumerate(self._map_arr):
+            if key is None:
+                continue
+            values = (str(midi_note), _NOTE_NAMES[midi_note], key)
+            old_values = shown.get(midi_note)
+            if old_values is None:
+                old_values = detached.pop(midi_note, None)
+                if old_values is None:
+                    tree.insert("", index, iid=str(midi_note), values=values)
+                else:
+                    tree.move(str(midi_note), "", index)
+                    if old_values != values:
+                        tree.item(str(midi_note), values=values)
+                shown[midi_note] = values
+            elif old_values != values:
+                tree.item(str(midi_note), values=values)
+                shown[midi_note] = values
+            index += 1
         
         # Update MIDI file info if a file is loaded
         self._update_file_info()
     
     def _update_file_info(self):
         """Update the MIDI file info label with current mapping stats"""
-        if hasattr(self, 'midi_player') and self.midi_player.events:
+        if hasattr(self, 'midi_player') and self.midi_player.has_events():
             self._update_file_info_full()
     
     def save_config(self):
         """Save current profile mappings to config file"""
-        # Update current profile with current mappings
-        self.profiles[self.current_profile] = self.midi_map.copy()
         if self.save_all_profiles():
             messagebox.showinfo("Success", f"Profile '{self.current_profile}' saved to {self.config_path}")
     
@@ -1750,11 +2166,8 @@ class MIDIMapperGUI:
         """Enable or disable MIDI to keyboard mapping"""
         self.mapping_enabled = self.enable_var.get()
         if not self.mapping_enabled:
-            # Release all active notes
-            for note in list(self.active_notes):
-                if note in self.midi_map:
-                    self.mapper.release_key(self.midi_map[note])
-            self.active_notes.clear()
+            # Have the key worker release all held notes
+            self._key_q.put_nowait((-1, False))
     
     # MIDI File Player Methods
     def browse_midi_file(self):
@@ -1802,7 +2215,7 @@ class MIDIMapperGUI:
     
     def _update_file_info_full(self):
         """Update file info and note range display"""
-        if not hasattr(self, 'midi_player') or not self.midi_player.events:
+        if not hasattr(self, 'midi_player') or not self.midi_player.has_events():
             return
         
         total_notes = self.midi_player.get_note_count()
@@ -1836,7 +2249,7 @@ class MIDIMapperGUI:
     
     def on_adjust_notes_changed(self):
         """Handle note adjustment checkbox change"""
-        if hasattr(self, 'midi_player') and self.midi_player.original_events:
+        if hasattr(self, 'midi_player') and self.midi_player.original_times.size:
             self.midi_player.set_note_adjustment(
                 self.adjust_notes_var.get(),
                 self._get_selected_base_note(),
@@ -1846,7 +2259,7 @@ class MIDIMapperGUI:
     
     def on_base_note_changed(self, event=None):
         """Handle base note selection change"""
-        if hasattr(self, 'midi_player') and self.midi_player.original_events:
+        if hasattr(self, 'midi_player') and self.midi_player.original_times.size:
             self.midi_player.set_note_adjustment(
                 self.adjust_notes_var.get(),
                 self._get_selected_base_note(),
@@ -1876,7 +2289,7 @@ class MIDIMapperGUI:
     
     def play_midi_file(self):
         """Start playing the loaded MIDI file"""
-        if not self.midi_player.events:
+        if not self.midi_player.has_events():
             messagebox.showwarning("Warning", "Please load a MIDI file first")
             return
         
@@ -1891,7 +2304,7 @@ class MIDIMapperGUI:
     
     def test_and_play_midi(self):
         """Play test notes, then a sample from middle, then start full playback"""
-        if not self.midi_player.events:
+        if not self.midi_player.has_events():
             messagebox.showwarning("Warning", "Please load a MIDI file first")
             return
         
@@ -1923,7 +2336,7 @@ class MIDIMapperGUI:
             
             # Get mapped notes from the MIDI file
             mapped_notes = []
-            for event_time, event_type, note in self.midi_player.events:
+            for event_time, event_type, note in self.midi_player.iter_events():
                 if event_type == 'on' and note in self.midi_map:
                     if note not in mapped_notes:
                         mapped_notes.append(note)
@@ -1969,8 +2382,8 @@ class MIDIMapperGUI:
             
             # Get events from the middle section
             middle_events = [
-                (t, typ, n) for t, typ, n in self.midi_player.events
-                if middle_start <= t <= middle_end and n in self.midi_map
+                (t, typ, n) for t, typ, n in self.midi_player.iter_events(middle_start, middle_end)
+                if n in self.midi_map
             ]
             
             if middle_events:
@@ -2065,7 +2478,7 @@ class MIDIMapperGUI:
             
             # Get mapped notes from the MIDI file
             mapped_notes = []
-            for event_time, event_type, note in self.midi_player.events:
+            for event_time, event_type, note in self.midi_player.iter_events():
                 if event_type == 'on' and note in self.midi_map:
                     if note not in mapped_notes:
                         mapped_notes.append(note)
@@ -2115,8 +2528,8 @@ class MIDIMapperGUI:
             
             # Get events around current position
             nearby_events = [
-                (t, typ, n) for t, typ, n in self.midi_player.events
-                if sample_start <= t <= sample_end and n in self.midi_map
+                (t, typ, n) for t, typ, n in self.midi_player.iter_events(sample_start, sample_end)
+                if n in self.midi_map
             ]
             
             if nearby_events:
@@ -2183,7 +2596,7 @@ class MIDIMapperGUI:
     def pause_midi_file(self):
         """Pause/resume playback"""
         if self.midi_player.paused:
-            self.midi_player.paused = False
+            self.midi_player.resume()
             self.pause_btn.config(text="Pause")
             self.practice_btn.config(state="disabled")
             self.current_note_label.config(text="Resuming playback...")
@@ -2271,6 +2684,10 @@ class MIDIMapperGUI:
             
             # Check if playback finished
             if current_time >= total_time:
+                # Drop a pending note label update so it can't overwrite the message below
+                if self._player_note_after is not None:
+                    self.root.after_cancel(self._player_note_after)
+                    self._player_note_after = None
                 self.play_btn.config(state="normal")
                 self.test_play_btn.config(state="normal")
                 self.pause_btn.config(state="disabled", text="Pause")
@@ -2282,14 +2699,20 @@ class MIDIMapperGUI:
     
     def on_player_note(self, note: int, key: str, is_on: bool):
         """Callback for note events during playback"""
-        def update():
+        # Dense passages only need the latest note shown; one Tk update per refresh
+        self._player_note = (note, key, is_on)
+        if self._player_note_after is None:
+            self._player_note_after = self.root.after(self.REFRESH_DEBOUNCE_MS, self._show_player_note)
+    
+    def _show_player_note(self):
+        """Show the most recent note reported by the player"""
+        self._player_note_after = None
+        note, key, is_on = self._player_note
+        if is_on:
             note_name = self.get_note_name(note)
-            if is_on:
-                self.current_note_label.config(text=f"Playing: Note {note} ({note_name}) -> Key '{key}'")
-            else:
-                self.current_note_label.config(text="")
-        
-        self.root.after(0, update)
+            self.current_note_label.config(text=f"Playing: Note {note} ({note_name}) -> Key '{key}'")
+        else:
+            self.current_note_label.config(text="")
     
     # Audio to MIDI Converter Methods
     def _get_audio_converter(self):
@@ -2500,7 +2923,7 @@ class MIDIMapperGUI:
         self.batch_workers_spinbox.config(state="disabled")
         
         self.convert_status_label.config(
-            text=f"Starting parallel conversion of {len(file_pairs)} files with {num_workers} workers...",
+            text=f"Starting parallel conversion of {len(file_pairs)} files with up to {num_workers} workers...",
             foreground=self.COLORS['accent']
         )
         self.convert_progress_var.set(0)
@@ -2559,11 +2982,17 @@ class MIDIMapperGUI:
             foreground=self.COLORS['success'] if failed_count == 0 else self.COLORS['warning']
         )
         
-        messagebox.showinfo("Parallel Batch Conversion Complete", 
-                           f"Converted {success_count} of {total} files\n"
-                           f"Success: {success_count}\n"
-                           f"Failed: {failed_count}\n\n"
-                           f"Output folder: {self.midi_output_folder_var.get()}")
+        summary = (f"Converted {success_count} of {total} files\n"
+                   f"Success: {success_count}\n"
+                   f"Failed: {failed_count}\n\n"
+                   f"Output folder: {self.midi_output_folder_var.get()}")
+        error_details = self.audio_converter.format_last_exception() if failed_count else None
+        if error_details:
+            print(f"Last batch conversion error:\n{error_details}")
+            messagebox.showwarning("Parallel Batch Conversion Complete",
+                                   f"{summary}\n\nLast error:\n{error_details.strip().splitlines()[-1]}")
+        else:
+            messagebox.showinfo("Parallel Batch Conversion Complete", summary)
     
     def _on_conversion_complete(self, result: Optional[str], load_after: bool):
         """Handle conversion completion"""
@@ -2771,10 +3200,20 @@ class MIDIMapperGUI:
             self.keyboard_listener.stop()
         # Stop MIDI file player
         if hasattr(self, 'midi_player'):
-            self.midi_player.stop()
+            self.midi_player.close()
         self.disconnect_midi()
-        # Save current profile before closing
-        self.profiles[self.current_profile] = self.midi_map.copy()
+        # Let go of any held keys, then stop the key worker
+        self._key_q.put_nowait((-1, False))
+        self._key_q.put_nowait(None)
+        self._key_thread.join(timeout=0.5)
+        self.mapper.keyboard.close()
+        # Flush pending work, then save profiles before closing
+        if self._refresh_after is not None:
+            self.root.after_cancel(self._refresh_after)
+            self._refresh_after = None
+        if self._save_after is not None:
+            self.root.after_cancel(self._save_after)
+            self._save_after = None
         self.save_all_profiles()
         self.root.destroy()
 
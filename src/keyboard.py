@@ -4,7 +4,10 @@ Supports Windows, macOS, and Linux.
 """
 
 import platform
+import shutil
 import subprocess
+import threading
+import time
 from typing import Optional
 
 SYSTEM = platform.system().lower()
@@ -12,9 +15,58 @@ IS_WINDOWS = SYSTEM == 'windows'
 IS_MAC = SYSTEM == 'darwin'
 IS_LINUX = SYSTEM == 'linux'
 
+# Key names -> X keysym names understood by xdotool/libxdo
+_XDO_KEY_NAMES = {
+    'ctrl': 'ctrl', 'shift': 'shift', 'alt': 'alt',
+    'space': 'space', 'enter': 'Return', 'tab': 'Tab',
+    'esc': 'Escape', 'up': 'Up', 'down': 'Down',
+    'left': 'Left', 'right': 'Right',
+    'f1': 'F1', 'f2': 'F2', 'f3': 'F3', 'f4': 'F4',
+    'f5': 'F5', 'f6': 'F6', 'f7': 'F7', 'f8': 'F8',
+    'f9': 'F9', 'f10': 'F10', 'f11': 'F11', 'f12': 'F12',
+    'backspace': 'BackSpace', 'delete': 'Delete',
+    'home': 'Home', 'end': 'End',
+    'page_up': 'Page_Up', 'page_down': 'Page_Down',
+}
+
+# Key names -> macOS virtual key codes for the AppleScript fallback
+_MAC_KEY_CODES = {
+    'a': 0, 'b': 11, 'c': 8, 'd': 2, 'e': 14, 'f': 3, 'g': 5, 'h': 4,
+    'i': 34, 'j': 38, 'k': 40, 'l': 37, 'm': 46, 'n': 45, 'o': 31,
+    'p': 35, 'q': 12, 'r': 15, 's': 1, 't': 17, 'u': 32, 'v': 9,
+    'w': 13, 'x': 7, 'y': 16, 'z': 6,
+    'space': 49, 'enter': 36, 'tab': 48, 'esc': 53,
+    'shift': 56, 'ctrl': 59, 'alt': 58, 'cmd': 55,
+    'up': 126, 'down': 125, 'left': 123, 'right': 124,
+    'f1': 122, 'f2': 120, 'f3': 99, 'f4': 118, 'f5': 96, 'f6': 97,
+    'f7': 98, 'f8': 100, 'f9': 101, 'f10': 109, 'f11': 103, 'f12': 111,
+    'backspace': 51, 'delete': 117, 'home': 115, 'end': 119,
+    'page_up': 116, 'page_down': 121,
+}
+
+
+def _pynput_key_map(Key) -> dict:
+    """Build the key name -> pynput Key table (pynput is imported lazily by the backends)."""
+    return {
+        'space': Key.space, 'enter': Key.enter, 'tab': Key.tab,
+        'esc': Key.esc, 'shift': Key.shift, 'ctrl': Key.ctrl,
+        'alt': Key.alt, 'up': Key.up, 'down': Key.down,
+        'left': Key.left, 'right': Key.right,
+        'f1': Key.f1, 'f2': Key.f2, 'f3': Key.f3, 'f4': Key.f4,
+        'f5': Key.f5, 'f6': Key.f6, 'f7': Key.f7, 'f8': Key.f8,
+        'f9': Key.f9, 'f10': Key.f10, 'f11': Key.f11, 'f12': Key.f12,
+        'backspace': Key.backspace, 'delete': Key.delete,
+        'home': Key.home, 'end': Key.end,
+        'page_up': Key.page_up, 'page_down': Key.page_down,
+    }
+
 
 class PlatformKeyboard:
-    """Cross-platform keyboard input handler."""
+    """Cross-platform keyboard input handler.
+    
+    Key names must already be canonical (lowercase, no spaces), as produced by
+    src.mapper.canonicalize_key; the backends don't re-normalize per event.
+    """
     
     def __init__(self):
         if IS_WINDOWS:
@@ -37,9 +89,62 @@ class PlatformKeyboard:
     def press_combination(self, modifiers: list, key: Optional[str] = None):
         """Press a key combination."""
         self.impl.press_combination(modifiers, key)
+    
+    def compile_key(self, modifiers: tuple, key: Optional[str] = None):
+        """Precompute a key/chord so it can be sent later without parsing."""
+        return self.impl.compile_key(modifiers, key)
+    
+    def press_compiled(self, compiled):
+        """Press a key/chord returned by compile_key()."""
+        self.impl.press_compiled(compiled)
+    
+    def release_compiled(self, compiled):
+        """Release a key/chord returned by compile_key()."""
+        self.impl.release_compiled(compiled)
+    
+    def close(self):
+        """Release any resources held by the platform backend."""
+        self.impl.close()
+
+
+class _KeyboardBackend:
+    """Default compiled-key handling shared by the backends.
+    
+    A chord (modifiers + key) is tapped on press; a single key or bare
+    modifiers are held until release.
+    """
+    
+    # Seconds to wait between the modifiers and the key of a chord (0 = none)
+    chord_delay = 0.0
+    
+    def compile_key(self, modifiers: tuple, key: Optional[str] = None):
+        """Precompute a key/chord; the default keeps the parsed names."""
+        return tuple(modifiers), key
+    
+    def press_compiled(self, compiled):
+        """Press a key/chord returned by compile_key()."""
+        modifiers, key = compiled
+        if modifiers and key:
+            self.press_combination(modifiers, key)
+        elif key:
+            self.press_key(key)
+        else:
+            for mod in modifiers:
+                self.press_key(mod)
+    
+    def release_compiled(self, compiled):
+        """Release a key/chord returned by compile_key()."""
+        modifiers, key = compiled
+        if key:
+            self.release_key(key)
+        for mod in reversed(modifiers):
+            self.release_key(mod)
+    
+    def close(self):
+        """Release any resources held by the backend."""
 
 
-class _WindowsKeyboard:
+class _WindowsKeyboard(_KeyboardBackend):
     """Windows implementation using DirectInput with scan codes for game compatibility."""
     
     def __init__(self):
@@ -77,6 +182,12 @@ class _WindowsKeyboard:
             'home', 'end', 'page_up', 'page_down'
         }
         
+        # key string -> (scan_code, is_extended); prefilled for every known key
+        # name so only unusual spellings ever miss
+        self._scan_cache = {
+            name: (code, name in self.EXTENDED_KEYS) for name, code in self.SCAN_CODES.items()
+        }
+        
         ULONG_PTR = ctypes.c_ulonglong if ctypes.sizeof(ctypes.c_void_p) == 8 else ctypes.c_ulong
         
         class KEYBDINPUT(ctypes.Structure):
@@ -88,8 +199,20 @@ class _WindowsKeyboard:
                 ("dwExtraInfo", ULONG_PTR)
             ]
         
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [
+                ("dx", ctypes.c_long),
+                ("dy", ctypes.c_long),
+                ("mouseData", ctypes.c_ulong),
+                ("dwFlags", ctypes.c_ulong),
+                ("time", ctypes.c_ulong),
+                ("dwExtraInfo", ULONG_PTR)
+            ]
+        
+        # MOUSEINPUT is the largest member, so it gives INPUT its real
+        # Win32 size and arrays of INPUT get the stride SendInput expects
         class INPUT_UNION(ctypes.Union):
-            _fields_ = [("ki", KEYBDINPUT)]
+            _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
         
         class INPUT(ctypes.Structure):
             _fields_ = [
@@ -106,8 +229,18 @@ class _WindowsKeyboard:
         self.SendInput.argtypes = [ctypes.c_uint, ctypes.POINTER(INPUT), ctypes.c_int]
         self.SendInput.restype = ctypes.c_uint
         
+        # One reusable INPUT record; only wScan/dwFlags change per event.
+        # The lock keeps the live MIDI and file player threads from sharing it mid-call.
+        self._input = INPUT(type=self.INPUT_KEYBOARD)
+        self._input_ref = ctypes.byref(self._input)
+        self._input_size = ctypes.sizeof(INPUT)
+        self._input_lock = threading.Lock()
+        
     def _get_scan_code(self, key: str) -> tuple:
         """Get scan code and extended flag for a key."""
+        cached = self._scan_cache.get(key)
+        if cached is not None:
+            return cached
         if not key:
             return 0, False
         
@@ -115,7 +248,9 @@ class _WindowsKeyboard:
         scan_code = self.SCAN_CODES.get(key_lower, 0)
         is_extended = key_lower in self.EXTENDED_KEYS
         
-        return scan_code, is_extended
+        result = (scan_code, is_extended)
+        self._scan_cache[key] = result
+        return result
     
     def _send_key_event(self, scan_code: int, is_extended: bool, key_up: bool = False):
         """Send a key event using DirectInput scan codes."""
@@ -124,25 +259,15 @@ class _WindowsKeyboard:
             flags |= self.KEYEVENTF_KEYUP
         if is_extended:
             flags |= self.KEYEVENTF_EXTENDEDKEY
-        
-        ki = self.KEYBDINPUT(
-            wVk=0,
-            wScan=self.ctypes.c_ushort(scan_code),
-            dwFlags=self.ctypes.c_ulong(flags),
-            time=0,
-            dwExtraInfo=0
-        )
-        
-        union = self.INPUT_UNION(ki=ki)
-        x = self.INPUT(
-            type=self.ctypes.c_ulong(self.INPUT_KEYBOARD),
-            union=union
-        )
-        
-        is_64bit = self.ctypes.sizeof(self.ctypes.c_void_p) == 8
-        input_size = 40 if is_64bit else 28
-        
-        result = self.SendInput(1, self.ctypes.byref(x), input_size)
+        return self._send_scan_event(scan_code, flags)
+    
+    def _send_scan_event(self, scan_code: int, flags: int):
+        """Send one scan code event with precomputed flags."""
+        with self._input_lock:
+            ki = self._input.union.ki
+            ki.wScan = scan_code
+            ki.dwFlags = flags
+            result = self.SendInput(1, self._input_ref, self._input_size)
         return result == 1
     
     def press_key(self, key: str):
@@ -159,70 +284,135 @@ class _WindowsKeyboard:
     
     def press_combination(self, modifiers: list, key: Optional[str] = None):
         """Press a key combination using DirectInput."""
-        import time
+        delay = self.chord_delay
         for mod in modifiers:
             self.press_key(mod)
         if key:
-            time.sleep(0.01)
+            if delay > 0:
+                time.sleep(delay)
             self.press_key(key)
-            time.sleep(0.01)
+            if delay > 0:
+                time.sleep(delay)
             self.release_key(key)
         for mod in reversed(modifiers):
             self.release_key(mod)
+    
+    def compile_key(self, modifiers: tuple, key: Optional[str] = None):
+        """Precompute the (scan_code, flags) events for pressing and releasing a key/chord."""
+        keyup = self.KEYEVENTF_KEYUP
+        
+        def down_event(name):
+            scan_code, is_extended = self._get_scan_code(name)
+            if not scan_code:
+                return None
+            flags = self.KEYEVENTF_SCANCODE
+            if is_extended:
+                flags |= self.KEYEVENTF_EXTENDEDKEY
+            return scan_code, flags
+        
+        mods = [e for e in map(down_event, modifiers) if e]
+        mods_up = [(scan, flags | keyup) for scan, flags in reversed(mods)]
+        main = down_event(key) if key else None
+        main_up = [(main[0], main[1] | keyup)] if main else []
+        
+        chord = None
+        if modifiers and key:
+            # Tapped on press; release just lets go of anything still down
+            press = mods + ([main] if main else []) + main_up + mods_up
+            chord = (tuple(modifiers), key)
+        elif key:
+            press = [main] if main else []
+        else:
+            press = mods
+        release = main_up + mods_up
+        return self._build_inputs(press), self._build_inputs(release), chord
+    
+    def _build_inputs(self, events: list):
+        """Build a ready-to-send INPUT array from (scan_code, flags) events."""
+        inputs = (self.INPUT * len(events))()
+        for record, (scan_code, flags) in zip(inputs, events):
+            record.type = self.INPUT_KEYBOARD
+            record.union.ki.wScan = scan_code
+            record.union.ki.dwFlags = flags
+        return inputs
+    
+    def press_compiled(self, compiled):
+        """Send the precomputed press events for a key/chord in one SendInput call."""
+        press, _, chord = compiled
+        if chord and self.chord_delay > 0:
+            self.press_combination(*chord)
+            return
+        if press:
+            self.SendInput(len(press), press, self._input_size)
+    
+    def release_compiled(self, compiled):
+        """Send the precomputed release events for a key/chord in one SendInput call."""
+        release = compiled[1]
+        if release:
+            self.SendInput(len(release), release, self._input_size)
 
 
-class _MacKeyboard:
+class _MacKeyboard(_KeyboardBackend):
     """macOS implementation using pynput/AppleScript."""
     
-    KEY_CODES = {
-        'a': 0, 'b': 11, 'c': 8, 'd': 2, 'e': 14, 'f': 3, 'g': 5, 'h': 4,
-        'i': 34, 'j': 38, 'k': 40, 'l': 37, 'm': 46, 'n': 45, 'o': 31,
-        'p': 35, 'q': 12, 'r': 15, 's': 1, 't': 17, 'u': 32, 'v': 9,
-        'w': 13, 'x': 7, 'y': 16, 'z': 6,
-        'space': 49, 'enter': 36, 'tab': 48, 'esc': 53,
-        'shift': 56, 'ctrl': 59, 'alt': 58, 'cmd': 55,
-        'up': 126, 'down': 125, 'left': 123, 'right': 124,
-        'f1': 122, 'f2': 120, 'f3': 99, 'f4': 118, 'f5': 96, 'f6': 97,
-        'f7': 98, 'f8': 100, 'f9': 101, 'f10': 109, 'f11': 103, 'f12': 111,
-        'backspace': 51, 'delete': 117, 'home': 115, 'end': 119,
-        'page_up': 116, 'page_down': 121,
-    }
-    
     def __init__(self):
+        self._osa = None
         try:
             from pynput.keyboard import Key, Controller
             self.use_pynput = True
             self.keyboard = Controller()
             self.Key = Key
+            self._key_map = _pynput_key_map(Key)
+            self._mod_map = {'ctrl': Key.ctrl, 'shift': Key.shift, 'alt': Key.alt}
         except ImportError:
             self.use_pynput = False
             print("Warning: pynput not available, using AppleScript (less reliable)")
+            self._start_osascript()
     
     def _get_key_name(self, key: str) -> Optional[str]:
         """Convert key string to pynput Key or character."""
         if self.use_pynput:
-            key_map = {
-                'space': self.Key.space, 'enter': self.Key.enter, 'tab': self.Key.tab,
-                'esc': self.Key.esc, 'shift': self.Key.shift, 'ctrl': self.Key.ctrl,
-                'alt': self.Key.alt, 'up': self.Key.up, 'down': self.Key.down,
-                'left': self.Key.left, 'right': self.Key.right,
-                'f1': self.Key.f1, 'f2': self.Key.f2, 'f3': self.Key.f3, 'f4': self.Key.f4,
-                'f5': self.Key.f5, 'f6': self.Key.f6, 'f7': self.Key.f7, 'f8': self.Key.f8,
-                'f9': self.Key.f9, 'f10': self.Key.f10, 'f11': self.Key.f11, 'f12': self.Key.f12,
-                'backspace': self.Key.backspace, 'delete': self.Key.delete,
-                'home': self.Key.home, 'end': self.Key.end,
-                'page_up': self.Key.page_up, 'page_down': self.Key.page_down,
-            }
-            key_lower = key.lower()
-            if key_lower in key_map:
-                return key_map[key_lower]
+            key_obj = self._key_map.get(key)
+            if key_obj is not None:
+                return key_obj
             elif len(key) == 1:
                 return key
         return None
     
+    def _start_osascript(self):
+        """Start one interactive osascript process to feed key events to."""
+        try:
+            self._osa = subprocess.Popen(
+                ['osascript', '-i'], stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                text=True, bufsize=1
+            )
+        except OSError:
+            self._osa = None
+    
+    def close(self):
+        """Stop the persistent osascript process, if any."""
+        osa, self._osa = self._osa, None
+        if osa is not None:
+            try:
+                osa.stdin.close()
+                osa.wait(timeout=1)
+            except Exception:
+                osa.kill()
+    
     def _send_applescript(self, key_code: int, key_down: bool):
         """Send key event using AppleScript."""
         action = "key down" if key_down else "key up"
+        osa = self._osa
+        if osa is not None and osa.poll() is None:
+            try:
+                # One line per event; the process runs them in order
+                osa.stdin.write(f'tell application "System Events" to {action} {key_code}\n')
+                osa.stdin.flush()
+                return
+            except (OSError, ValueError):
+                self._osa = None
+        
         script = f'''
         tell application "System Events"
             {action} {key_code}
@@ -244,9 +434,9 @@ class _MacKeyboard:
                     if isinstance(key_obj, str):
                         self.keyboard.press(key_obj)
         else:
-            key_lower = key.lower()
-            if key_lower in self.KEY_CODES:
-                self._send_applescript(self.KEY_CODES[key_lower], True)
+            key_code = _MAC_KEY_CODES.get(key)
+            if key_code is not None:
+                self._send_applescript(key_code, True)
     
     def release_key(self, key: str):
         """Release a key."""
@@ -259,29 +449,29 @@ class _MacKeyboard:
                     if isinstance(key_obj, str):
                         self.keyboard.release(key_obj)
         else:
-            key_lower = key.lower()
-            if key_lower in self.KEY_CODES:
-                self._send_applescript(self.KEY_CODES[key_lower], False)
+            key_code = _MAC_KEY_CODES.get(key)
+            if key_code is not None:
+                self._send_applescript(key_code, False)
     
     def press_combination(self, modifiers: list, key: Optional[str] = None):
         """Press a key combination."""
-        import time
+        delay = self.chord_delay
         if self.use_pynput:
-            mod_map = {
-                'ctrl': self.Key.ctrl, 'shift': self.Key.shift, 'alt': self.Key.alt
-            }
-            mod_keys = [mod_map.get(m.lower()) for m in modifiers if m.lower() in mod_map]
+            mod_map = self._mod_map
+            mod_keys = [mod_map[m] for m in modifiers if m in mod_map]
             
             for mod in mod_keys:
                 if mod:
                     self.keyboard.press(mod)
             
             if key:
-                time.sleep(0.01)
+                if delay > 0:
+                    time.sleep(delay)
                 key_obj = self._get_key_name(key)
                 if key_obj:
                     self.keyboard.press(key_obj)
-                    time.sleep(0.01)
+                    if delay > 0:
+                        time.sleep(delay)
                     self.keyboard.release(key_obj)
             
             for mod in reversed(mod_keys):
@@ -291,19 +481,27 @@ class _MacKeyboard:
             for mod in modifiers:
                 self.press_key(mod)
             if key:
-                time.sleep(0.01)
+                if delay > 0:
+                    time.sleep(delay)
                 self.press_key(key)
-                time.sleep(0.01)
+                if delay > 0:
+                    time.sleep(delay)
                 self.release_key(key)
             for mod in reversed(modifiers):
                 self.release_key(mod)
 
 
-class _LinuxKeyboard:
-    """Linux implementation using xdotool or pynput."""
+class _LinuxKeyboard(_KeyboardBackend):
+    """Linux implementation using libxdo, xdotool or pynput."""
     
     def __init__(self):
-        self.use_xdotool = self._check_command('xdotool')
+        # Prefer libxdo in-process; fall back to spawning xdotool per event
+        self._xdo = None
+        self._xdo_seqs = {}
+        # An xdo_t context is not thread-safe; the live MIDI and file player threads share it
+        self._xdo_lock = threading.Lock()
+        self.use_pynput = False
+        self.use_xdotool = self._load_libxdo() or self._check_command('xdotool')
         
         if not self.use_xdotool:
             try:
@@ -311,39 +509,80 @@ class _LinuxKeyboard:
                 self.use_pynput = True
                 self.keyboard = Controller()
                 self.Key = Key
+                self._key_map = _pynput_key_map(Key)
+                self._mod_map = {'ctrl': Key.ctrl, 'shift': Key.shift, 'alt': Key.alt}
                 print("Warning: xdotool not found, using pynput (may require X11)")
             except ImportError:
                 raise RuntimeError(
                     "Linux requires either 'xdotool' (install: sudo apt install xdotool) or 'pynput'"
                 )
+        
+        # Bind the chosen backend once so each key event is a direct call
+        if self.use_xdotool:
+            self.press_key = self._xdotool_press
+            self.release_key = self._xdotool_release
+        else:
+            self.press_key = self._pynput_press
+            self.release_key = self._pynput_release
     
-    def _check_command(self, cmd: str) -> bool:
-        """Check if a command is available."""
+    def _load_libxdo(self) -> bool:
+        """Open libxdo and create a context, if the library is installed."""
+        import ctypes
+        import ctypes.util
+        
         try:
-            subprocess.run(['which', cmd], check=True, capture_output=True)
-            return True
-        except:
+            lib = ctypes.CDLL('libxdo.so.3')
+        except OSError:
+            name = ctypes.util.find_library('xdo')
+            if not name:
+                return False
+            try:
+                lib = ctypes.CDLL(name)
+            except OSError:
+                return False
+        
+        lib.xdo_new.argtypes = [ctypes.c_char_p]
+        lib.xdo_new.restype = ctypes.c_void_p
+        # (xdo, window, keysequence, delay_us); window 0 means the focused window
+        for func in (lib.xdo_send_keysequence_window,
+                     lib.xdo_send_keysequence_window_down,
+                     lib.xdo_send_keysequence_window_up):
+            func.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_char_p, ctypes.c_uint]
+            func.restype = ctypes.c_int
+        
+        xdo = lib.xdo_new(None)
+        if not xdo:
             return False
+        
+        self._xdo = xdo
+        self._xdo_send = lib.xdo_send_keysequence_window
+        self._xdo_down = lib.xdo_send_keysequence_window_down
+        self._xdo_up = lib.xdo_send_keysequence_window_up
+        return True
+    
+    def _xdo_seq(self, sequence: str) -> bytes:
+        """Get the encoded libxdo key sequence for a keysym string."""
+        seq = self._xdo_seqs.get(sequence)
+        if seq is None:
+            seq = self._xdo_seqs[sequence] = sequence.encode('utf-8')
+        return seq
+    
+    def _check_command(self, cmd: str) -> bool:
+        """Check if a command is available."""
+        return shutil.which(cmd) is not None
     
     def _xdotool_key(self, key: str, press: bool = True):
-        """Send key using xdotool."""
-        action = 'keydown' if press else 'keyup'
-        key_map = {
-            'ctrl': 'ctrl', 'shift': 'shift', 'alt': 'alt',
-            'space': 'space', 'enter': 'Return', 'tab': 'Tab',
-            'esc': 'Escape', 'up': 'Up', 'down': 'Down',
-            'left': 'Left', 'right': 'Right',
-            'f1': 'F1', 'f2': 'F2', 'f3': 'F3', 'f4': 'F4',
-            'f5': 'F5', 'f6': 'F6', 'f7': 'F7', 'f8': 'F8',
-            'f9': 'F9', 'f10': 'F10', 'f11': 'F11', 'f12': 'F12',
-            'backspace': 'BackSpace', 'delete': 'Delete',
-            'home': 'Home', 'end': 'End',
-            'page_up': 'Page_Up', 'page_down': 'Page_Down',
-        }
+        """Send key using libxdo, or the xdotool command if libxdo is unavailable."""
+        xdotool_key = _XDO_KEY_NAMES.get(key, key)
         
-        key_lower = key.lower()
-        xdotool_key = key_map.get(key_lower, key)
+        if self._xdo is not None:
+            send = self._xdo_down if press else self._xdo_up
+            seq = self._xdo_seq(xdotool_key)
+            with self._xdo_lock:
+                send(self._xdo, 0, seq, 0)
+            return
         
+        action = 'keydown' if press else 'keyup'
         try:
             subprocess.run(['xdotool', action, xdotool_key], check=True, capture_output=True)
         except subprocess.CalledProcessError:
@@ -351,58 +590,54 @@ class _LinuxKeyboard:
     
     def _get_key_name(self, key: str):
         """Convert key string to pynput Key or character."""
-        if hasattr(self, 'use_pynput') and self.use_pynput:
-            key_map = {
-                'space': self.Key.space, 'enter': self.Key.enter, 'tab': self.Key.tab,
-                'esc': self.Key.esc, 'shift': self.Key.shift, 'ctrl': self.Key.ctrl,
-                'alt': self.Key.alt, 'up': self.Key.up, 'down': self.Key.down,
-                'left': self.Key.left, 'right': self.Key.right,
-                'f1': self.Key.f1, 'f2': self.Key.f2, 'f3': self.Key.f3, 'f4': self.Key.f4,
-                'f5': self.Key.f5, 'f6': self.Key.f6, 'f7': self.Key.f7, 'f8': self.Key.f8,
-                'f9': self.Key.f9, 'f10': self.Key.f10, 'f11': self.Key.f11, 'f12': self.Key.f12,
-                'backspace': self.Key.backspace, 'delete': self.Key.delete,
-                'home': self.Key.home, 'end': self.Key.end,
-                'page_up': self.Key.page_up, 'page_down': self.Key.page_down,
-            }
-            key_lower = key.lower()
-            if key_lower in key_map:
-                return key_map[key_lower]
+        if self.use_pynput:
+            key_obj = self._key_map.get(key)
+            if key_obj is not None:
+                return key_obj
             elif len(key) == 1:
                 return key
         return None
     
-    def press_key(self, key: str):
-        """Press a key."""
-        if self.use_xdotool:
-            self._xdotool_key(key, press=True)
-        elif hasattr(self, 'use_pynput') and self.use_pynput:
-            key_obj = self._get_key_name(key)
-            if key_obj:
-                try:
+    def _xdotool_press(self, key: str):
+        """Press a key via libxdo/xdotool."""
+        self._xdotool_key(key, press=True)
+    
+    def _xdotool_release(self, key: str):
+        """Release a key via libxdo/xdotool."""
+        self._xdotool_key(key, press=False)
+    
+    def _pynput_press(self, key: str):
+        """Press a key via pynput."""
+        key_obj = self._get_key_name(key)
+        if key_obj:
+            try:
+                self.keyboard.press(key_obj)
+            except:
+                if isinstance(key_obj, str):
                     self.keyboard.press(key_obj)
-                except:
-                    if isinstance(key_obj, str):
-                        self.keyboard.press(key_obj)
     
-    def release_key(self, key: str):
-        """Release a key."""
-        if self.use_xdotool:
-            self._xdotool_key(key, press=False)
-        elif hasattr(self, 'use_pynput') and self.use_pynput:
-            key_obj = self._get_key_name(key)
-            if key_obj:
-                try:
+    def _pynput_release(self, key: str):
+        """Release a key via pynput."""
+        key_obj = self._get_key_name(key)
+        if key_obj:
+            try:
+                self.keyboard.release(key_obj)
+            except:
+                if isinstance(key_obj, str):
                     self.keyboard.release(key_obj)
-                except:
-                    if isinstance(key_obj, str):
-                        self.keyboard.release(key_obj)
     
     def press_combination(self, modifiers: list, key: Optional[str] = None):
         """Press a key combination."""
-        import time
+        delay = self.chord_delay
         if self.use_xdotool:
             mod_str = '+'.join(modifiers)
-            if key:
+            if key and self._xdo is not None:
+                # Whole chord in one libxdo call, like `xdotool key ctrl+shift+a`
+                sequence = '+'.join([*modifiers, _XDO_KEY_NAMES.get(key, key)])
+                seq = self._xdo_seq(sequence)
+                with self._xdo_lock:
+                    self._xdo_send(self._xdo, 0, seq, int(delay * 1000000))
+            elif key:
                 try:
                     subprocess.run(
                         ['xdotool', 'key', f'{mod_str}+{key}'], 
@@ -413,22 +648,22 @@ class _LinuxKeyboard:
             else:
                 for mod in modifiers:
                     self.press_key(mod)
-        elif hasattr(self, 'use_pynput') and self.use_pynput:
-            mod_map = {
-                'ctrl': self.Key.ctrl, 'shift': self.Key.shift, 'alt': self.Key.alt
-            }
-            mod_keys = [mod_map.get(m.lower()) for m in modifiers if m.lower() in mod_map]
+        elif self.use_pynput:
+            mod_map = self._mod_map
+            mod_keys = [mod_map[m] for m in modifiers if m in mod_map]
             
             for mod in mod_keys:
                 if mod:
                     self.keyboard.press(mod)
             
             if key:
-                time.sleep(0.01)
+                if delay > 0:
+                    time.sleep(delay)
                 key_obj = self._get_key_name(key)
                 if key_obj:
                     self.keyboard.press(key_obj)
-                    time.sleep(0.01)
+                    if delay > 0:
+                        time.sleep(delay)
                     self.keyboard.release(key_obj)
             
             for mod in reversed(mod_keys):
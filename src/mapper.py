@@ -5,23 +5,127 @@ Cross-platform support for Windows, macOS, and Linux.
 """
 
 import json
+import os
 import sys
+import threading
+import time
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
 try:
-    import mido
+    import orjson
 except ImportError:
-    print("Error: mido library not found. Please install it with: pip install mido")
-    sys.exit(1)
+    orjson = None
 
 from src.keyboard import PlatformKeyboard
 
 
+# Parsed config files keyed by (path, st_mtime_ns)
+_CONFIG_CACHE: Dict[Tuple[str, int], dict] = {}
+
+# mido loads its MIDI backend on import, so it is only imported once a port is needed
+_mido = None
+
+
+def _get_mido():
+    """Import mido on first use."""
+    global _mido
+    if _mido is None:
+        try:
+            import mido
+        except ImportError:
+            print("Error: mido library not found. Please install it with: pip install mido")
+            sys.exit(1)
+        _mido = mido
+    return _mido
+
+
+# (time.monotonic() of the last enumeration, port names)
+_ports_cache: Tuple[float, List[str]] = (0.0, [])
+
+
+def _cached_input_names(ttl: float = 2.0) -> List[str]:
+    """Return MIDI input port names, re-enumerating the OS MIDI system at most once per ttl."""
+    global _ports_cache
+    stamp, names = _ports_cache
+    now = time.monotonic()
+    if not names or now - stamp >= ttl:
+        names = _get_mido().get_input_names()
+        _ports_cache = (now, names)
+    return names
+
+
+def _raise_thread_priority():
+    """Best-effort bump of the calling thread to realtime/time-critical priority."""
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            # THREAD_PRIORITY_TIME_CRITICAL
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 15)
+        except Exception:
+            pass
+    elif hasattr(os, 'sched_setscheduler'):
+        # On Linux pid 0 means the calling thread; needs CAP_SYS_NICE or an rtprio limit
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(20))
+        except OSError:
+            pass
+
+
+_VALID_MODIFIERS = frozenset(('ctrl', 'shift', 'alt'))
+
+
+@lru_cache(maxsize=256)
+def _parse_key(key: str) -> Tuple[Tuple[str, ...], Optional[str]]:
+    """Split a canonical key string into (modifiers, char_key); identical strings share one result."""
+    # Mappings are canonicalized when loaded or assigned, so no per-call normalization
+    if '+' not in key:
+        return (), key
+    
+    modifiers = []
+    char_key = None
+    for part in key.split('+'):
+        if part in _VALID_MODIFIERS:
+            modifiers.append(part)
+        else:
+            char_key = part
+    
+    return tuple(modifiers), char_key or None
+
+
+def canonicalize_key(key: str) -> str:
+    """Normalize a key string to the stored form: lowercase, no spaces."""
+    return key.lower().replace(" ", "")
+
+
+def encode_config(config: dict) -> bytes:
+    """Serialize a config dict the way config.json is written (2-space indent, UTF-8)."""
+    if orjson is not None:
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    # Same bytes orjson produces, so comparing against a previous write holds either way
+    return json.dumps(config, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def dump_config(path: Path, data: bytes):
+    """Write encoded config bytes to path atomically."""
+    # Write a sibling temp file and swap it in so a crash mid-write
+    # can't leave a truncated config behind
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
 class MIDIToKeyboardMapper:
     """Maps MIDI note events to keyboard key presses."""
     
-    def __init__(self, config_file: str = None, profile_name: Optional[str] = None):
+    # Note-ons beyond this many undispatched events are dropped; note-offs always queue
+    MAX_PENDING_NOTES = 64
+    
+    def __init__(self, config_file: str = None, profile_name: Optional[str] = None,
+                 verbose: bool = False):
         from utils.resources import get_config_path
         if config_file:
             self.config_path = Path(config_file)
@@ -29,9 +133,22 @@ class MIDIToKeyboardMapper:
             self.config_path = get_config_path()
         self.keyboard = PlatformKeyboard()
         self.midi_map: Dict[int, str] = {}
-        self.active_notes: Dict[int, bool] = {}
-        self.current_port: Optional[mido.ports.BaseInput] = None
+        # Dense per-note tables used by the note handlers (MIDI notes are 0-127)
+        self.midi_map_arr: List[Optional[str]] = [None] * 128
+        # Each mapping parsed and compiled for the keyboard backend once, at load time
+        self.actions_arr: List[Optional[tuple]] = [None] * 128
+        # Bit n is set while note n's key is held
+        self.active_mask = 0
+        self.current_port: Optional['mido.ports.BaseInput'] = None
+        # Set instead of current_port when the port was opened directly through python-rtmidi
+        self._rt_in = None
         self.velocity_threshold = 0
+        # Per-note logging is opt-in; events are queued here and printed off the MIDI thread
+        self.verbose = verbose
+        self._log_ring: Deque[Tuple[int, int]] = deque(maxlen=256)
+        # (note, velocity) events from the port callback; velocity 0 is a release
+        self._pending: Deque[Tuple[int, int]] = deque()
+        self._pending_ready = threading.Event()
         self.load_config(profile_name=profile_name)
     
     def load_config(self, profile_name: Optional[str] = None):
@@ -43,8 +160,7 @@ class MIDIToKeyboardMapper:
             return
         
         try:
-            with open(self.config_path, 'r') as f:
-                config = json.load(f)
+            config = self._read_config()
             
             if "profiles" in config:
                 profiles = config.get("profiles", {})
@@ -57,13 +173,12 @@ class MIDIToKeyboardMapper:
                     print(f"Warning: Profile '{profile_name}' not found, using default")
                     selected_profile = "default"
                 
-                if selected_profile not in profiles:
+                profile_data = profiles.get(selected_profile)
+                if profile_data is None:
+                    # Local stand-in only: config is shared with the read cache and must not change
                     print(f"Warning: Profile '{selected_profile}' not found, creating default")
-                    profiles[selected_profile] = {"midi_map": {}, "velocity_threshold": 0}
-                
-                profile_data = profiles[selected_profile]
-                self.midi_map = profile_data.get("midi_map", {})
-                self.midi_map = {int(k): v for k, v in self.midi_map.items()}
+                    profile_data = {"midi_map": {}, "velocity_threshold": 0}
+                self._build_note_arrays(profile_data.get("midi_map") or {})
                 
                 print(f"Loaded profile '{selected_profile}' with {len(self.midi_map)} MIDI note mappings")
                 if profile_data.get("velocity_threshold", 0) > 0:
@@ -71,9 +186,7 @@ class MIDIToKeyboardMapper:
                 else:
                     self.velocity_threshold = 0
             else:
-                old_midi_map = config.get("midi_map", {})
-                old_midi_map = {int(k): v for k, v in old_midi_map.items()}
-                self.midi_map = old_midi_map
+                self._build_note_arrays(config.get("midi_map") or {})
                 
                 print(f"Loaded {len(self.midi_map)} MIDI note mappings (legacy format)")
                 if config.get("velocity_threshold", 0) > 0:
@@ -88,6 +201,18 @@ class MIDIToKeyboardMapper:
             print(f"Error loading config: {e}")
             sys.exit(1)
     
+    def _read_config(self) -> dict:
+        """Parse the config file, reusing the last parse while its mtime is unchanged."""
+        mtime = self.config_path.stat().st_mtime_ns
+        cache_key = (str(self.config_path), mtime)
+        config = _CONFIG_CACHE.get(cache_key)
+        if config is None:
+            raw = self.config_path.read_bytes()
+            config = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            _CONFIG_CACHE.clear()
+            _CONFIG_CACHE[cache_key] = config
+        return config
+    
     def create_default_config(self):
         """Create a default configuration file with profile support."""
         default_profile_map = {
@@ -106,17 +231,34 @@ class MIDIToKeyboardMapper:
             "description": "MIDI note number (0-127) maps to keyboard key"
         }
         
-        with open(self.config_path, 'w') as f:
-            json.dump(default_config, f, indent=2)
+        dump_config(self.config_path, encode_config(default_config))
         
-        self.midi_map = {int(k): v for k, v in default_profile_map.items()}
+        self._build_note_arrays(default_profile_map)
         self.velocity_threshold = 0
         print(f"Created default config file: {self.config_path}")
         print("You can edit it to customize your MIDI to keyboard mappings")
     
+    def _build_note_arrays(self, raw_map: Dict[str, str]):
+        """Parse a config midi_map into midi_map and the 128-slot note tables in one pass."""
+        midi_map: Dict[int, str] = {}
+        midi_map_arr: List[Optional[str]] = [None] * 128
+        actions_arr: List[Optional[tuple]] = [None] * 128
+        for k, v in raw_map.items():
+            note = int(k)
+            # Out-of-range notes can never arrive, so they are dropped here
+            if 0 <= note < 128:
+                key = canonicalize_key(v)
+                midi_map[note] = key
+                midi_map_arr[note] = key
+                actions_arr[note] = self.compile_key(key)
+        self.midi_map = midi_map
+        self.midi_map_arr = midi_map_arr
+        self.actions_arr = actions_arr
+        self.active_mask = 0
+    
     def list_midi_ports(self):
         """List available MIDI input ports."""
-        ports = mido.get_input_names()
+        ports = _cached_input_names()
         if not ports:
             print("No MIDI input ports found!")
             return []
@@ -126,9 +268,13 @@ class MIDIToKeyboardMapper:
             print(f"  [{i}] {port}")
         return ports
     
-    def open_midi_port(self, port_name: Optional[str] = None):
-        """Open a MIDI input port."""
-        ports = mido.get_input_names()
+    def open_midi_port(self, port_name: Optional[str] = None, callback=None, raw_callback=None):
+        """Open a MIDI input port, optionally delivering messages to a callback.
+        
+        With raw_callback the port is opened through python-rtmidi when possible, and
+        raw_callback receives rtmidi's (bytes, delta) events instead of mido Messages.
+        """
+        ports = _cached_input_names()
         
         if not ports:
             print("Error: No MIDI input ports available!")
@@ -137,126 +283,224 @@ class MIDIToKeyboardMapper:
         if port_name is None:
             port_name = ports[0]
             print(f"Using first available port: {port_name}")
-        elif port_name not in ports:
-            print(f"Error: Port '{port_name}' not found!")
-            print("Available ports:")
-            for port in ports:
-                print(f"  - {port}")
-            return False
+        else:
+            # Match case-insensitively, then open by the port's real name
+            by_lower = {name.lower(): name for name in ports}
+            matched = by_lower.get(port_name.lower())
+            if matched is None:
+                print(f"Error: Port '{port_name}' not found!")
+                print("Available ports:")
+                for port in ports:
+                    print(f"  - {port}")
+                return False
+            port_name = matched
+        
+        if raw_callback is not None and self._open_rtmidi_port(port_name, raw_callback):
+            print(f"Successfully opened MIDI port: {port_name}")
+            return True
         
         try:
-            self.current_port = mido.open_input(port_name)
+            self.current_port = _get_mido().open_input(port_name, callback=callback)
+            self._ignore_non_note_messages(self.current_port)
             print(f"Successfully opened MIDI port: {port_name}")
             return True
         except Exception as e:
             print(f"Error opening MIDI port: {e}")
             return False
     
+    def _open_rtmidi_port(self, port_name: str, callback) -> bool:
+        """Open port_name with python-rtmidi's native callback; False to fall back to mido."""
+        try:
+            import rtmidi
+        except ImportError:
+            return False
+        try:
+            midi_in = rtmidi.MidiIn(queue_size_limit=128)
+            names = midi_in.get_ports()
+            if port_name not in names:
+                midi_in.delete()
+                return False
+            midi_in.open_port(names.index(port_name))
+            midi_in.ignore_types(sysex=True, timing=True, active_sense=True)
+            midi_in.set_callback(callback)
+        except Exception:
+            return False
+        self._rt_in = midi_in
+        return True
+    
+    def close_midi_port(self):
+        """Close whichever MIDI input port is open."""
+        if self._rt_in is not None:
+            self._rt_in.cancel_callback()
+            self._rt_in.close_port()
+            self._rt_in.delete()
+            self._rt_in = None
+            print("Closed MIDI port")
+        elif self.current_port:
+            self.current_port.close()
+            self.current_port = None
+            print("Closed MIDI port")
+    
+    def _ignore_non_note_messages(self, port):
+        """Drop sysex, clock and active sensing in the rtmidi backend, before they reach Python."""
+        rt = getattr(port, '_rt', None)
+        if rt is not None:
+            try:
+                rt.ignore_types(sysex=True, timing=True, active_sense=True)
+            except Exception:
+                pass
+    
+    def resolve_key(self, key: str) -> Tuple[Tuple[str, ...], Optional[str]]:
+        """Parse a canonical key string like 'ctrl+shift+a' into (modifiers, char_key)."""
+        return _parse_key(key)
+    
+    def compile_key(self, key: str):
+        """Precompute a key string into the keyboard backend's ready-to-send form."""
+        return self.keyboard.compile_key(*self.resolve_key(key))
+    
+    def compile_note_table(self, midi_map: Dict[int, str]) -> Tuple[List[Optional[str]], list]:
+        """Build 128-slot (key, compiled key) tables from a note -> key map.
+        
+        Each key is parsed and compiled once here instead of on every note event.
+        """
+        key_table: List[Optional[str]] = [midi_map.get(note) for note in range(128)]
+        compile_key = self.compile_key
+        return key_table, [compile_key(key) if key is not None else None for key in key_table]
+    
+    def press_compiled(self, compiled):
+        """Press a key returned by compile_key()."""
+        self.keyboard.press_compiled(compiled)
+    
+    def release_compiled(self, compiled):
+        """Release a key returned by compile_key()."""
+        self.keyboard.release_compiled(compiled)
+    
     def press_key(self, key: str):
         """Press a keyboard key."""
-        key_lower = key.lower().strip()
-        
-        if '+' in key_lower:
-            parts = key_lower.split('+')
-            modifiers = []
-            char_key = None
-            
-            valid_modifiers = {'ctrl', 'shift', 'alt'}
-            
-            for part in parts:
-                part = part.strip()
-                if part in valid_modifiers:
-                    modifiers.append(part)
-                else:
-                    char_key = part
-            
-            if char_key:
-                self.keyboard.press_combination(modifiers, char_key)
-            else:
-                for mod in modifiers:
-                    self.keyboard.press_key(mod)
-        else:
-            self.keyboard.press_key(key_lower)
+        self.press_compiled(self.compile_key(key))
     
     def release_key(self, key: str):
         """Release a keyboard key."""
-        key_lower = key.lower().strip()
-        
-        if '+' in key_lower:
-            parts = key_lower.split('+')
-            modifiers = []
-            char_key = None
-            
-            valid_modifiers = {'ctrl', 'shift', 'alt'}
-            
-            for part in parts:
-                part = part.strip()
-                if part in valid_modifiers:
-                    modifiers.append(part)
-                else:
-                    char_key = part
-            
-            if char_key:
-                self.keyboard.release_key(char_key)
-                for mod in reversed(modifiers):
-                    self.keyboard.release_key(mod)
-            else:
-                for mod in reversed(modifiers):
-                    self.keyboard.release_key(mod)
-        else:
-            self.keyboard.release_key(key_lower)
+        self.release_compiled(self.compile_key(key))
     
     def handle_note_on(self, note: int, velocity: int):
         """Handle MIDI note on event."""
         if velocity < self.velocity_threshold:
             return
         
-        if note in self.midi_map:
-            key = self.midi_map[note]
-            if not self.active_notes.get(note, False):
-                self.press_key(key)
-                self.active_notes[note] = True
-                print(f"Note ON:  MIDI {note} -> Key '{key}' (velocity: {velocity})")
+        action = self.actions_arr[note]
+        bit = 1 << note
+        if action is not None and not self.active_mask & bit:
+            self.keyboard.press_compiled(action)
+            self.active_mask |= bit
+            if self.verbose:
+                self._log_ring.append((note, velocity))
     
     def handle_note_off(self, note: int):
         """Handle MIDI note off event."""
-        if note in self.midi_map:
-            key = self.midi_map[note]
-            if self.active_notes.get(note, False):
-                self.release_key(key)
-                self.active_notes[note] = False
-                print(f"Note OFF: MIDI {note} -> Key '{key}'")
+        bit = 1 << note
+        if self.active_mask & bit:
+            self.keyboard.release_compiled(self.actions_arr[note])
+            self.active_mask &= ~bit
+            if self.verbose:
+                self._log_ring.append((note, 0))
+    
+    def _queue_note(self, note: int, velocity: int):
+        """Hand a note event to the dispatch thread; velocity 0 is a release."""
+        # Shed note-ons in a burst the dispatcher can't keep up with; releases are never dropped
+        if velocity and len(self._pending) >= self.MAX_PENDING_NOTES:
+            return
+        self._pending.append((note, velocity))
+        self._pending_ready.set()
+    
+    def _on_rtmidi(self, event, data=None):
+        """Queue a raw note message delivered by python-rtmidi's callback."""
+        message = event[0]
+        status = message[0]
+        # Note off (0x8n) and note on (0x9n) differ only in bit 4, so one mask catches both
+        if (status & 0xE0) == 0x80:
+            self._queue_note(message[1], message[2] if status & 0x10 else 0)
+    
+    def _on_message(self, message):
+        """Queue a MIDI message delivered by the mido port callback."""
+        msg_type = message.type
+        # Sounding note_on is the common case: one type compare
+        if msg_type == 'note_on':
+            self._queue_note(message.note, message.velocity)
+        elif msg_type == 'note_off':
+            # note_off and velocity-0 note_on share one release path
+            self._queue_note(message.note, 0)
+    
+    def _dispatch_loop(self, stop: threading.Event):
+        """Press and release keys for queued note events until stopped."""
+        _raise_thread_priority()
+        pending = self._pending
+        ready = self._pending_ready
+        handle_note_on = self.handle_note_on
+        handle_note_off = self.handle_note_off
+        while not stop.is_set():
+            ready.wait(0.5)
+            ready.clear()
+            # A whole chord is handled in one wake-up
+            while pending:
+                note, velocity = pending.popleft()
+                if velocity:
+                    handle_note_on(note, velocity)
+                else:
+                    handle_note_off(note)
+    
+    def _flush_log(self):
+        """Print the note events queued since the last flush."""
+        ring = self._log_ring
+        while ring:
+            note, velocity = ring.popleft()
+            if velocity:
+                print(f"Note ON:  MIDI {note} -> Key '{self.midi_map_arr[note]}' (velocity: {velocity})")
+            else:
+                print(f"Note OFF: MIDI {note} -> Key '{self.midi_map_arr[note]}'")
+    
+    def _log_loop(self, stop: threading.Event):
+        """Flush the note log every 100ms until stopped."""
+        while not stop.wait(0.1):
+            self._flush_log()
+        self._flush_log()
     
     def run(self, port_name: Optional[str] = None):
         """Start listening to MIDI input and mapping to keyboard."""
-        if not self.open_midi_port(port_name):
+        if not self.open_midi_port(port_name, callback=self._on_message, raw_callback=self._on_rtmidi):
             return
         
         if not self.midi_map:
             print("Error: No MIDI mappings configured!")
             print(f"Please edit {self.config_path} to add mappings.")
+            self.close_midi_port()
             return
         
         print("\nMIDI to Keyboard Mapper is running...")
         print("Press Ctrl+C to stop")
         print("-" * 50)
         
+        # The port callback only queues events; key presses happen on the dispatch thread
+        stop = threading.Event()
+        dispatch_thread = threading.Thread(target=self._dispatch_loop, args=(stop,), daemon=True)
+        dispatch_thread.start()
+        log_thread = None
+        if self.verbose:
+            log_thread = threading.Thread(target=self._log_loop, args=(stop,), daemon=True)
+            log_thread.start()
         try:
-            for message in self.current_port:
-                if message.type == 'note_on':
-                    if message.velocity > 0:
-                        self.handle_note_on(message.note, message.velocity)
-                    else:
-                        self.handle_note_off(message.note)
-                elif message.type == 'note_off':
-                    self.handle_note_off(message.note)
+            while not stop.wait(0.5):
+                pass
         
         except KeyboardInterrupt:
             print("\n\nStopping MIDI mapper...")
         finally:
-            if self.current_port:
-                self.current_port.close()
-                print("Closed MIDI port")
+            self.close_midi_port()
+            stop.set()
+            self._pending_ready.set()
+            dispatch_thread.join(timeout=0.5)
+            if log_thread is not None:
+                log_thread.join(timeout=0.5)
 
 
 
@@ -0,0 +1,51 @@
+"""
+Reusable float32 buffers for the transcription pipeline.
+"""
+
+import queue
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class Float32Pool:
+    """Thread-safe pool of float32 arrays keyed by shape."""
+
+    def __init__(self, max_per_shape: int = 4, max_shapes: int = 8):
+        self.max_per_shape = max_per_shape
+        # Bounds memory when callers ask for many one-off shapes
+        self.max_shapes = max_shapes
+        self._free: Dict[Tuple[int, ...], queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, shape) -> np.ndarray:
+        """Return an uninitialized float32 array of the given shape."""
+        shape = tuple(shape)
+        free = self._free.get(shape)
+        if free is not None:
+            try:
+                return free.get_nowait()
+            except queue.Empty:
+                pass
+        return np.empty(shape, dtype=np.float32)
+
+    def release(self, arr: np.ndarray):
+        """Give an array from acquire() back to the pool; it must not be used afterwards."""
+        # Views would keep their parent alive and alias other users' data
+        if arr.dtype != np.float32 or arr.base is not None:
+            return
+        with self._lock:
+            free = self._free.get(arr.shape)
+            if free is None:
+                if len(self._free) >= self.max_shapes:
+                    return
+                free = self._free[arr.shape] = queue.LifoQueue(maxsize=self.max_per_shape)
+        try:
+            free.put_nowait(arr)
+        except queue.Full:
+            pass
+
+
+# Shared by all transcriptions in the process
+float32_pool = Float32Pool()
@@ -59,6 +59,14 @@ def get_model_path() -> Path:
     return get_resource_path("models/model.onnx")
 
 
+def get_model_cache_dir() -> Path:
+    """Get a writable directory for files derived from the model (e.g. the INT8 copy)."""
+    # Bundled resources live in a temporary extraction folder, so use the exe directory
+    if is_bundled():
+        return Path(sys.executable).parent / "models"
+    return get_model_path().parent
+
+
 def is_bundled() -> bool:
     """Check if running as a bundled executable."""
     return getattr(sys, 'frozen', False)